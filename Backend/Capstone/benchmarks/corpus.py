@@ -0,0 +1,74 @@
+import random
+from typing import List, Tuple
+
+# Synthetic reviews for benchmarks: seeded, so every run scores the same text
+
+PRODUCTS = [
+    "blender", "phone case", "headphones", "charger", "backpack", "water bottle",
+    "desk lamp", "keyboard", "coffee maker", "yoga mat", "air fryer", "monitor stand",
+]
+
+POSITIVE = [
+    "Works exactly as described and feels solid.",
+    "The build quality is great for the price.",
+    "Arrived quickly and well packaged.",
+    "I use it every day and it still looks new.",
+    "Setup took two minutes and it just works.",
+    "Battery life is better than I expected.",
+    "Good value for money, would recommend to friends.",
+    "Sturdy material and a nice finish.",
+]
+
+NEGATIVE = [
+    "Broke after a week of normal use.",
+    "The material feels cheap and flimsy.",
+    "Shipping was delayed twice and the box was crushed.",
+    "Overpriced for what you get.",
+    "Stopped charging after a few days, not worth the money.",
+    "Customer support never answered my emails.",
+    "It does not fit as advertised and I had to return it.",
+    "Loud, slow and disappointing overall.",
+]
+
+NEUTRAL = [
+    "It is okay, nothing special.",
+    "Does the job but the color is a bit different from the photos.",
+    "Average product at an average price.",
+    "Delivery was on time.",
+    "Not sure yet, will update after a month.",
+    "Comes in a plain box with a short manual.",
+]
+
+FAKE = [
+    "Amazing!!! Best ever, life changing product!!!",
+    "Perfect perfect perfect, absolutely fantastic and incredible!!!",
+    "Outstanding, phenomenal, unbelievable quality. Five stars!!!",
+    "Best {product} ever!!! Miraculous, buy it now!!!",
+    "Fantastic product! Will buy again.",
+    "Incredible!!! Changed my life, amazing {product}!!!",
+]
+
+SENTIMENT_LABELS = {"negative": 0, "neutral": 1, "positive": 2}
+
+def synthetic_review(rng: random.Random) -> Tuple[str, int, int]:
+    """One review with its fake (0/1) and sentiment (0/1/2) labels"""
+    product = rng.choice(PRODUCTS)
+    if rng.random() < 0.15:
+        text = rng.choice(FAKE).format(product=product)
+        return text, 1, SENTIMENT_LABELS["positive"]
+
+    sentiment = rng.choice(list(SENTIMENT_LABELS))
+    pool = {"positive": POSITIVE, "negative": NEGATIVE, "neutral": NEUTRAL}[sentiment]
+    sentences = [f"Bought this {product} {rng.choice(['last month', 'for my office', 'as a gift', 'on sale'])}."]
+    sentences += rng.sample(pool, rng.randint(1, min(4, len(pool))))
+    if rng.random() < 0.3:
+        sentences.append(rng.choice(NEUTRAL))
+    return " ".join(sentences), 0, SENTIMENT_LABELS[sentiment]
+
+def labeled_reviews(count: int, seed: int = 0) -> List[Tuple[str, int, int]]:
+    rng = random.Random(seed)
+    return [synthetic_review(rng) for _ in range(count)]
+
+def synthetic_reviews(count: int, seed: int = 0) -> List[str]:
+    """Review texts like a product page returns them, including repeated spam"""
+    return [text for text, _, _ in labeled_reviews(count, seed)]
@@ -0,0 +1,42 @@
+import os
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.svm import LinearSVC
+from benchmarks.corpus import labeled_reviews
+from utils.model_bundle import describe_sources, save_model_bundle
+from utils.model_loader import BUNDLED_PICKLES
+
+# Stand-in model artifacts with the same file names, vectorizer settings and
+# model types as ml_models/, trained on the synthetic corpus so benchmarks run
+# offline. Their predictions are meaningless; their cost is representative.
+
+TRAINING_REVIEWS = 5000
+
+def build_stand_in_models(models_dir: str, seed: int = 0) -> str:
+    """Write the pickles and a compiled bundle into models_dir; returns the bundle directory"""
+    os.makedirs(models_dir, exist_ok=True)
+    reviews = labeled_reviews(TRAINING_REVIEWS, seed)
+    texts = [text.lower() for text, _, _ in reviews]
+
+    fake_vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=5000)
+    fake_model = LinearSVC().fit(fake_vectorizer.fit_transform(texts), [fake for _, fake, _ in reviews])
+
+    sentiment_vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=10000)
+    sentiment_model = LinearSVC().fit(
+        sentiment_vectorizer.fit_transform(texts),
+        [sentiment for _, _, sentiment in reviews]
+    )
+
+    joblib.dump(fake_vectorizer, os.path.join(models_dir, "tfidf_vectorizer.pkl"))
+    joblib.dump(fake_model, os.path.join(models_dir, "svm_fake_review_model.pkl"))
+    joblib.dump(sentiment_vectorizer, os.path.join(models_dir, "tf_idf_vectorizersentiment.pkl"))
+    joblib.dump(sentiment_model, os.path.join(models_dir, "best_model_svmsentiment.pkl"))
+
+    bundle_dir = os.path.join(models_dir, "bundle")
+    save_model_bundle(
+        bundle_dir,
+        {"fake": fake_vectorizer, "sentiment": sentiment_vectorizer},
+        {"fake": fake_model, "sentiment": sentiment_model},
+        describe_sources([os.path.join(models_dir, name) for name in BUNDLED_PICKLES])
+    )
+    return bundle_dir
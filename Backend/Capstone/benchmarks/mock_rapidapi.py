@@ -0,0 +1,75 @@
+import asyncio
+import socket
+import threading
+import zlib
+from aiohttp import web
+from benchmarks.corpus import synthetic_reviews
+
+# A local stand-in for the RapidAPI product-reviews endpoint
+
+class MockRapidAPI:
+    """Serves /product-reviews on 127.0.0.1 from a background thread.
+
+    Every ASIN has `pages` pages of `page_size` synthetic reviews in the
+    real API's {"Reviewers": [{"Review": ...}]} shape; later pages are
+    empty. Each response is delayed by latency_seconds to stand in for
+    the network round trip.
+    """
+    def __init__(self, pages: int = 3, page_size: int = 10, latency_seconds: float = 0.0):
+        self.pages = pages
+        self.page_size = page_size
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        self.port = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _product_reviews(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        page = int(request.query.get("page", "1"))
+        if page > self.pages:
+            return web.json_response({"Reviewers": []})
+        seed = zlib.crc32(f"{request.query.get('asin', '')}:{page}".encode())
+        reviews = synthetic_reviews(self.page_size, seed)
+        return web.json_response({
+            "ProductName": "Benchmark product",
+            "Reviewers": [{"Review": review} for review in reviews]
+        })
+
+    def start(self) -> "MockRapidAPI":
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+
+        started = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            app = web.Application()
+            app.router.add_get("/product-reviews", self._product_reviews)
+            self._runner = web.AppRunner(app, access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            self._loop.run_until_complete(web.TCPSite(self._runner, "127.0.0.1", self.port).start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name="mock-rapidapi", daemon=True)
+        self._thread.start()
+        started.wait(10)
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
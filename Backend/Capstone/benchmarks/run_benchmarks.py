@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Benchmarks measure scoring, not caches or MongoDB; must be set before settings load
+os.environ["PREDICTION_CACHE_ENABLED"] = "false"
+os.environ["REVIEW_CACHE_ENABLED"] = "false"
+os.environ["RAPIDAPI_RETRY_DELAY_SECONDS"] = "0"
+
+from benchmarks.mock_rapidapi import MockRapidAPI
+
+# The mock API has to be up before api_connector reads RAPIDAPI_BASE_URL
+mock_api = MockRapidAPI().start()
+os.environ["RAPIDAPI_BASE_URL"] = mock_api.base_url
+
+import numpy as np
+import sklearn
+from benchmarks.corpus import synthetic_reviews
+from benchmarks.fixtures import build_stand_in_models
+from utils.api_connector import fetch_reviews_from_amazon
+from utils.http_client import http_client
+from utils.model_loader import ModelSlot, model_loader
+from utils.prediction import review_analyzer
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BATCH_SIZES = (1, 10, 100, 1000)
+MODEL_PATHS = ("ml", "bundle", "fallback")
+FETCH_LATENCIES = (0.0, 0.05)
+
+class Benchmark:
+    """One timed function; items is the number of reviews per call, for throughput"""
+    def __init__(self, name: str, params: dict, fn, items: int = 1):
+        self.name = name
+        self.params = params
+        self.fn = fn
+        self.items = items
+
+    @property
+    def full_name(self) -> str:
+        if not self.params:
+            return self.name
+        return f"{self.name}[{','.join(f'{key}={value}' for key, value in self.params.items())}]"
+
+def time_benchmark(benchmark: Benchmark, min_time: float, min_rounds: int, max_rounds: int) -> dict:
+    benchmark.fn()  # Warm-up: lazy imports, first-call caches
+    rounds = []
+    started = time.perf_counter()
+    while len(rounds) < max_rounds and (len(rounds) < min_rounds or time.perf_counter() - started < min_time):
+        round_started = time.perf_counter()
+        benchmark.fn()
+        rounds.append(time.perf_counter() - round_started)
+
+    median = statistics.median(rounds)
+    return {
+        "name": benchmark.full_name,
+        "group": benchmark.name,
+        "params": benchmark.params,
+        "rounds": len(rounds),
+        "min": min(rounds),
+        "max": max(rounds),
+        "mean": statistics.mean(rounds),
+        "median": median,
+        "stddev": statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+        "items_per_second": benchmark.items / median if median else None,
+    }
+
+def load_slots(models_dir: str, bundle_dir: str) -> dict:
+    missing_dir = os.path.join(models_dir, "missing")
+    slots = {
+        "ml": ModelSlot(models_dir, missing_dir),
+        "bundle": ModelSlot(models_dir, bundle_dir),
+        "fallback": ModelSlot(missing_dir, missing_dir),
+    }
+    for slot in slots.values():
+        slot.load()
+    return slots
+
+def analysis_benchmarks(slots: dict, batch_sizes) -> list:
+    corpus = synthetic_reviews(max(batch_sizes), seed=1)
+    single_review = corpus[0]
+    benchmarks = []
+
+    for path, slot in slots.items():
+        def single(slot=slot):
+            with model_loader.using(slot):
+                review_analyzer.analyze_single_review(single_review)
+        benchmarks.append(Benchmark("analyze_single_review", {"path": path}, single))
+
+        for batch_size in batch_sizes:
+            batch = corpus[:batch_size]
+            def analyze(slot=slot, batch=batch):
+                with model_loader.using(slot):
+                    review_analyzer.analyze_reviews(batch)
+            benchmarks.append(Benchmark("analyze_reviews", {"path": path, "batch": batch_size}, analyze, batch_size))
+    return benchmarks
+
+def fetch_benchmarks(loop: asyncio.AbstractEventLoop) -> list:
+    benchmarks = []
+    for latency in FETCH_LATENCIES:
+        def fetch(latency=latency):
+            mock_api.latency_seconds = latency
+            reviews = loop.run_until_complete(fetch_reviews_from_amazon("B0BENCH001", max_pages=3))
+            assert reviews, "mock API returned no reviews"
+        items = mock_api.pages * mock_api.page_size
+        benchmarks.append(Benchmark("fetch_reviews_from_amazon", {"latency_ms": int(latency * 1000)}, fetch, items))
+    return benchmarks
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scikit-learn": sklearn.__version__,
+    }
+
+def compare_results(results: dict, baseline_path: str, threshold: float) -> bool:
+    """Print median changes against an earlier run; False if anything regressed past threshold"""
+    with open(baseline_path) as f:
+        baseline = {entry["name"]: entry for entry in json.load(f)["benchmarks"]}
+
+    ok = True
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0%}):")
+    for entry in results["benchmarks"]:
+        previous = baseline.get(entry["name"])
+        if previous is None:
+            print(f"  {entry['name']:<60} new")
+            continue
+        change = entry["median"] / previous["median"] - 1
+        regressed = change > threshold
+        ok &= not regressed
+        print(f"  {entry['name']:<60} {change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+def run(args) -> int:
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        print("Building stand-in models...")
+        bundle_dir = build_stand_in_models(models_dir)
+        slots = load_slots(models_dir, bundle_dir)
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(http_client.start())
+
+        batch_sizes = [size for size in BATCH_SIZES if size <= args.max_batch]
+        benchmarks = analysis_benchmarks(slots, batch_sizes) + fetch_benchmarks(loop)
+        if args.filter:
+            benchmarks = [benchmark for benchmark in benchmarks if args.filter in benchmark.full_name]
+
+        entries = []
+        for benchmark in benchmarks:
+            entry = time_benchmark(benchmark, args.min_time, args.min_rounds, args.max_rounds)
+            entries.append(entry)
+            rate = f"{entry['items_per_second']:>10.1f} reviews/s" if benchmark.items > 1 else ""
+            print(f"{entry['name']:<60} median {entry['median'] * 1000:9.3f} ms  ({entry['rounds']} rounds) {rate}")
+
+        loop.run_until_complete(http_client.close())
+        loop.close()
+    mock_api.stop()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "machine": machine_info(),
+        "settings": {"min_time": args.min_time, "min_rounds": args.min_rounds, "max_rounds": args.max_rounds},
+        "benchmarks": entries,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{results['commit']}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare and not compare_results(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    # Usage: python benchmarks/run_benchmarks.py [--filter analyze_reviews] [--compare results/old.json]
+    parser = argparse.ArgumentParser(description="Benchmark the review analysis pipeline offline")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Median slowdown counted as a regression")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--max-batch", type=int, default=max(BATCH_SIZES), help="Largest analyze_reviews batch")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to keep repeating each benchmark")
+    parser.add_argument("--min-rounds", type=int, default=5)
+    parser.add_argument("--max-rounds", type=int, default=1000)
+    parser.add_argument("--verbose", action="store_true", help="Show application logs")
+    sys.exit(run(parser.parse_args()))
@@ -8,6 +8,35 @@ class Settings:
     SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key")
     RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY", "")
     RAPIDAPI_HOST = os.getenv("RAPIDAPI_HOST", "")
+    RAPIDAPI_BASE_URL = os.getenv("RAPIDAPI_BASE_URL", "https://real-time-amazon-data.p.rapidapi.com")
+    RAPIDAPI_TIMEOUT_SECONDS = int(os.getenv("RAPIDAPI_TIMEOUT_SECONDS", "30"))
+    RAPIDAPI_MAX_RETRIES = int(os.getenv("RAPIDAPI_MAX_RETRIES", "3"))
+    RAPIDAPI_RETRY_DELAY_SECONDS = float(os.getenv("RAPIDAPI_RETRY_DELAY_SECONDS", "2"))
+    RAPIDAPI_MAX_CONCURRENT_PAGES = int(os.getenv("RAPIDAPI_MAX_CONCURRENT_PAGES", "3"))
+    
+    # Inference Pool Settings
+    INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")  # "thread" or "process"
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 2)))
+    INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+    INFERENCE_MIN_CHUNK_SIZE = int(os.getenv("INFERENCE_MIN_CHUNK_SIZE", "25"))
+    MODEL_WARMUP_WAIT_SECONDS = float(os.getenv("MODEL_WARMUP_WAIT_SECONDS", "5"))
+    HEALTH_DB_TIMEOUT_SECONDS = float(os.getenv("HEALTH_DB_TIMEOUT_SECONDS", "1"))
+    
+    # Streaming Analysis Settings
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "10"))
+    
+    # Review Cache Settings
+    REVIEW_CACHE_ENABLED = os.getenv("REVIEW_CACHE_ENABLED", "true").lower() == "true"
+    REVIEW_CACHE_TTL_SECONDS = int(os.getenv("REVIEW_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+    REVIEW_CACHE_STALE_TTL_SECONDS = int(os.getenv("REVIEW_CACHE_STALE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+    REVIEW_CACHE_MEMORY_TTL_SECONDS = int(os.getenv("REVIEW_CACHE_MEMORY_TTL_SECONDS", "300"))
+    REVIEW_CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("REVIEW_CACHE_MEMORY_MAX_ENTRIES", "2000"))
+    REVIEW_CACHE_DB_TIMEOUT_SECONDS = float(os.getenv("REVIEW_CACHE_DB_TIMEOUT_SECONDS", "1"))
+    
+    # HTTP Connection Pool Settings
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))
+    HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "20"))
+    HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
     
     # JWT Settings
     ALGORITHM = "HS256"
@@ -21,5 +50,36 @@ class Settings:
     DATABASE_NAME = os.getenv("DATABASE_NAME", "review_db")
     REVIEWS_COLLECTION = os.getenv("REVIEWS_COLLECTION", "reviews")
     USERS_COLLECTION = os.getenv("USERS_COLLECTION", "users")
+    MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "2000"))  # Waiting for a free connection
+    
+    # Heuristic Keyword Settings
+    KEYWORDS_FILE = os.getenv("KEYWORDS_FILE", "")  # JSON: {"fake": [...], "quality": [...], ...}
+    HEURISTIC_UNCERTAINTY_MODE = os.getenv("HEURISTIC_UNCERTAINTY_MODE", "hash")  # "hash", "random" or "none"
+    HEURISTIC_UNCERTAINTY_SEED = os.getenv("HEURISTIC_UNCERTAINTY_SEED", "")
+    
+    # Near-Duplicate Settings
+    NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+    NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", "3"))  # SimHash bits, of 64
+    
+    # Authenticated User Cache Settings
+    USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "true").lower() == "true"
+    USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+    
+    # Prediction Cache Settings
+    PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+    PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "50000"))
+    PREDICTION_CACHE_TTL_SECONDS = int(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+
+    # Metrics Settings
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Model Settings
+    MODELS_DIR = os.getenv("MODELS_DIR", "ml_models")
+    MODEL_ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN", "")
+    MODEL_BUNDLE_DIR = os.getenv("MODEL_BUNDLE_DIR", "ml_models/bundle")
+    MODEL_BUNDLE_LOOKUP_CACHE_SIZE = int(os.getenv("MODEL_BUNDLE_LOOKUP_CACHE_SIZE", "100000"))
 
 settings = Settings()
\ No newline at end of file
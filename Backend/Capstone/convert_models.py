@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+sys.path.append('.')
+from config.settings import settings
+from utils.model_bundle import describe_sources, save_model_bundle
+from utils.model_loader import BUNDLED_PICKLES, ModelSlot
+
+# Compile the pickled vectorizers and SVMs into a memory-mapped bundle
+def convert_models(models_dir: str, bundle_dir: str):
+    # Fingerprint the pickles before reading them, so a file replaced meanwhile marks the bundle stale
+    sources = describe_sources([os.path.join(models_dir, name) for name in BUNDLED_PICKLES])
+
+    # Read the pickles directly, even if an older bundle is already in place
+    slot = ModelSlot(models_dir, bundle_dir)
+    slot._load_pickled_models(models_dir)
+
+    vectorizers = {"fake": slot.vectorizer, "sentiment": slot.sentiment_vectorizer}
+    models = {"fake": slot.fake_detection_model, "sentiment": slot.sentiment_model}
+    for name in ("fake", "sentiment"):
+        if vectorizers[name] is None or models[name] is None:
+            print(f"Skipping {name}: model or vectorizer pickle not found")
+            vectorizers[name] = models[name] = None
+
+    if not any(models.values()):
+        print("No models to convert")
+        return False
+
+    started = time.time()
+    manifest_path = save_model_bundle(bundle_dir, vectorizers, models, sources)
+    print(f"Wrote {manifest_path} in {time.time() - started:.1f}s")
+    return True
+
+if __name__ == "__main__":
+    # Usage: python convert_models.py [models_dir [bundle_dir]]
+    models_dir = sys.argv[1] if len(sys.argv) > 1 else settings.MODELS_DIR
+    default_bundle_dir = settings.MODEL_BUNDLE_DIR if len(sys.argv) < 2 else os.path.join(models_dir, "bundle")
+    bundle_dir = sys.argv[2] if len(sys.argv) > 2 else default_bundle_dir
+    if convert_models(models_dir, bundle_dir):
+        print("Model bundle ready. Restart the API to load it.")
@@ -2,7 +2,8 @@
 
 import sys
 sys.path.append('.')
-from database.mongo import user_collection
+from config.settings import settings
+from database.mongo import get_collection
 from utils.auth_utils import hash_password
 
 # Create a test user if it doesn't exist
@@ -13,6 +14,7 @@ def create_test_user():
         "password": hash_password("password123")
     }
     
+    user_collection = get_collection(settings.USERS_COLLECTION)
     existing_user = user_collection.find_one({"email": test_user["email"]})
     
     if existing_user:
@@ -0,0 +1,129 @@
+from database.mongo import async_mongo
+from bson import ObjectId
+from typing import Dict, Iterable, List, Optional
+import hashlib
+from pymongo.errors import BulkWriteError
+
+# A saved analysis is split in three:
+#   analysis_history  - the summary, with preview_text and detail_count instead of detailed_results
+#   analysis_results  - one row per review, keyed by (analysis_id, position)
+#   review_texts      - each distinct review text once, keyed by its content hash
+# Analyses saved before the split keep their embedded detailed_results; readers accept both.
+
+DUPLICATE_KEY = 11000
+
+def _analysis_history():
+    return async_mongo.collection("analysis_history")
+
+def _analysis_results():
+    return async_mongo.collection("analysis_results")
+
+def _review_texts():
+    return async_mongo.collection("review_texts")
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+async def _store_texts(texts: Dict[str, str]):
+    """Insert texts not stored yet; texts already present fail with a duplicate key and are skipped"""
+    try:
+        await _review_texts().insert_many(
+            [{"_id": digest, "text": text} for digest, text in texts.items()],
+            ordered=False
+        )
+    except BulkWriteError as e:
+        if any(error["code"] != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+            raise
+
+async def save_analysis(analysis_data: dict) -> str:
+    """Store an analysis (with user_id and timestamp set); returns its id"""
+    summary = {key: value for key, value in analysis_data.items() if key != "detailed_results"}
+    details = analysis_data.get("detailed_results") or []
+    analysis_id = ObjectId()
+
+    if details:
+        hashes = [text_hash(row["review_text"]) for row in details]
+        await _store_texts(dict(zip(hashes, (row["review_text"] for row in details))))
+        await _analysis_results().insert_many(
+            [
+                {
+                    **{key: value for key, value in row.items() if key != "review_text"},
+                    "analysis_id": analysis_id,
+                    "position": position,
+                    "text_hash": digest
+                }
+                for position, (row, digest) in enumerate(zip(details, hashes))
+            ],
+            ordered=False
+        )
+
+    # The summary goes in last, so history never lists an analysis whose rows are missing
+    summary["_id"] = analysis_id
+    summary["preview_text"] = details[0]["review_text"] if details else None
+    summary["detail_count"] = len(details)
+    summary["fake_results"] = sum(1 for row in details if row.get("is_fake") == "fake")
+    await _analysis_history().insert_one(summary)
+    return str(analysis_id)
+
+async def find_user_history(user_id: str, after: Optional[dict], include_details: bool, skip: int, limit: int) -> List[dict]:
+    """A page of the user's analyses, newest first; after is a keyset filter from the previous page.
+
+    Split analyses come back as summaries; attach_all_details loads their rows.
+    """
+    query = {"user_id": user_id}
+    if after:
+        query.update(after)
+    # Analyses saved before details were split out still embed them; keep one for the preview
+    projection = None if include_details else {"detailed_results": {"$slice": 1}}
+
+    # Served by the user_history index
+    cursor = _analysis_history().find(query, projection).sort([("timestamp", -1), ("_id", -1)])
+    return await cursor.skip(skip).limit(limit).to_list(None)
+
+async def _attach_texts(rows: List[dict]) -> List[dict]:
+    texts = {
+        doc["_id"]: doc["text"]
+        async for doc in _review_texts().find({"_id": {"$in": list({row["text_hash"] for row in rows})}})
+    }
+    details = []
+    for row in rows:
+        detail = {key: value for key, value in row.items() if key not in ("_id", "analysis_id", "position", "text_hash")}
+        detail["review_text"] = texts.get(row["text_hash"], "")
+        details.append(detail)
+    return details
+
+async def get_analysis_details(analysis: dict, skip: int = 0, limit: int = 100) -> List[dict]:
+    """Detailed results of one analysis summary, in their original order"""
+    if limit <= 0:
+        return []
+    if "detailed_results" in analysis:
+        return analysis["detailed_results"][skip:skip + limit]
+    # Positions are 0..n-1, so paging is an index range rather than a skip
+    rows = await _analysis_results().find(
+        {"analysis_id": analysis["_id"], "position": {"$gte": skip}},
+        sort=[("position", 1)],
+        limit=limit
+    ).to_list(None)
+    return await _attach_texts(rows)
+
+async def attach_all_details(analyses: Iterable[dict]):
+    """Fill in detailed_results for summaries that don't embed them, in one query per collection"""
+    split = {analysis["_id"]: analysis for analysis in analyses if "detailed_results" not in analysis}
+    if not split:
+        return
+    rows = await _analysis_results().find(
+        {"analysis_id": {"$in": list(split)}},
+        sort=[("analysis_id", 1), ("position", 1)]
+    ).to_list(None)
+    for analysis in split.values():
+        analysis["detailed_results"] = []
+    for row, detail in zip(rows, await _attach_texts(rows)):
+        split[row["analysis_id"]]["detailed_results"].append(detail)
+
+async def find_user_analysis(user_id: str, analysis_id: str) -> Optional[dict]:
+    """The user's analysis by id; None if it is missing or belongs to someone else"""
+    try:
+        object_id = ObjectId(analysis_id)
+    except Exception:
+        return None
+    return await _analysis_history().find_one({"_id": object_id, "user_id": user_id})
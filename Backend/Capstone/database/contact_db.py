@@ -1,7 +1,7 @@
-from database.mongo import contact_messages
+from database.mongo import async_mongo
 from datetime import datetime
 
-def save_contact_message(name: str, email: str, message: str, username: str = None) -> str:
+async def save_contact_message(name: str, email: str, message: str, username: str = None) -> str:
     """Save a contact message to the database"""
     message_data = {
         "name": name,
@@ -10,5 +10,5 @@ def save_contact_message(name: str, email: str, message: str, username: str = No
         "username": username,  
         "timestamp": datetime.now(),
     }
-    result = contact_messages.insert_one(message_data)
+    result = await async_mongo.collection("contact_messages").insert_one(message_data)
     return str(result.inserted_id)
\ No newline at end of file
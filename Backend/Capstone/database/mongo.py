@@ -1,41 +1,124 @@
-from fastapi import FastAPI
+import asyncio
 import logging
+from typing import Optional
+import pymongo
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.database import Database
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 from config.settings import settings
+from utils.metrics import metrics
 
-app = FastAPI()
-
-# Create a new client and connect to the server
-client = MongoClient(settings.MONGODB_URI, server_api=ServerApi('1'))
-db = client[settings.DATABASE_NAME]
-
-# Define specific collections for easy access
-review_collection = db[settings.REVIEWS_COLLECTION]
-user_collection = db[settings.USERS_COLLECTION]
+def client_options() -> dict:
+    """Connection pool sizing shared by the sync and async clients"""
+    return {
+        "server_api": ServerApi('1'),
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "event_listeners": metrics.mongo_listeners()
+    }
 
 # Set up logging to capture info and errors
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Synchronous client for scripts, created by the first get_database() call;
+# the API itself only uses async_mongo
+_sync_client: Optional[MongoClient] = None
+
+def get_database() -> Database:
+    """Synchronous database handle for scripts"""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = MongoClient(settings.MONGODB_URI, **client_options())
+    return _sync_client[settings.DATABASE_NAME]
+
+def get_collection(collection_name):
+    """Get a specific collection from the database"""
+    return get_database()[collection_name]
+
 def ping_mongo():
     try:
-        client.admin.command('ping')
+        get_database().client.admin.command('ping')
         logger.info("Pinged your deployment. You successfully connected to MongoDB!")
     except Exception as e:
         logger.error(f"Error connecting to MongoDB: {e}")
         raise Exception("Failed to connect to MongoDB")
 
-def get_database():
-    return db
+class AsyncMongo:
+    """Motor client for request handlers, opened by start() in the running event loop"""
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db: Optional[AsyncIOMotorDatabase] = None
 
-def get_collection(collection_name):
-    """Get a specific collection from the database"""
-    return db[collection_name]
+    def start(self) -> AsyncIOMotorDatabase:
+        if self.client is None:
+            self.client = AsyncIOMotorClient(settings.MONGODB_URI, **client_options())
+            self.db = self.client[settings.DATABASE_NAME]
+            logger.info(
+                f"✅ MongoDB connection pool ready (max={settings.MONGODB_MAX_POOL_SIZE}, "
+                f"min={settings.MONGODB_MIN_POOL_SIZE})"
+            )
+        return self.db
+
+    def database(self) -> AsyncIOMotorDatabase:
+        if self.db is None:
+            raise RuntimeError("MongoDB client not started; call async_mongo.start() first")
+        return self.db
+
+    def collection(self, name: str):
+        return self.database()[name]
+
+    async def ping(self):
+        await self.database().command('ping')
+
+    async def check(self, timeout_seconds: float) -> bool:
+        """Quiet connectivity check for health probes, bounded by timeout_seconds"""
+        try:
+            await asyncio.wait_for(self.ping(), timeout=timeout_seconds)
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        client, self.client, self.db = self.client, None, None
+        if client is not None:
+            client.close()
+            logger.info("MongoDB connection pool closed")
+
+    def stats(self) -> dict:
+        return {
+            "open": self.client is not None,
+            "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+            "wait_queue_timeout_ms": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+        }
+
+# Global async database instance
+async_mongo = AsyncMongo()
 
-def get_db():
-    """Alias for get_database for compatibility"""
-    return get_database()
+# Indexes created at startup by ensure_indexes; (collection name, keys, options)
+INDEXES = [
+    # Serves a user's history newest first, with _id breaking timestamp ties for keyset paging
+    (
+        "analysis_history",
+        [("user_id", pymongo.ASCENDING), ("timestamp", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)],
+        {"name": "user_history"}
+    ),
+    (
+        "analysis_results",
+        [("analysis_id", pymongo.ASCENDING), ("position", pymongo.ASCENDING)],
+        {"name": "analysis_rows", "unique": True}
+    ),
+    (settings.USERS_COLLECTION, [("username", pymongo.ASCENDING)], {"name": "unique_username", "unique": True}),
+    (settings.USERS_COLLECTION, [("email", pymongo.ASCENDING)], {"name": "unique_email", "unique": True}),
+]
 
-contact_messages = db["contact_messages"]
-analysis_history = db["analysis_history"]
\ No newline at end of file
+async def ensure_indexes():
+    """Create the indexes the API's queries rely on; each failure is logged and skipped"""
+    for name, keys, options in INDEXES:
+        try:
+            await async_mongo.collection(name).create_index(keys, **options)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create index {options['name']} on {name}: {str(e)}")
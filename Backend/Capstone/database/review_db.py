@@ -0,0 +1,36 @@
+from database.mongo import async_mongo
+from config.settings import settings
+from datetime import datetime, timedelta
+from typing import List, Optional
+import pymongo
+
+def review_page_id(asin: str, country: str, page: int) -> str:
+    return f"{asin}:{country}:{page}"
+
+def _review_pages():
+    return async_mongo.collection(settings.REVIEWS_COLLECTION)
+
+async def ensure_review_cache_indexes():
+    """Let MongoDB drop cached pages once they are too old to serve even as stale"""
+    await _review_pages().create_index(
+        [("expires_at", pymongo.ASCENDING)],
+        expireAfterSeconds=0,
+        name="review_cache_expiry"
+    )
+
+async def get_cached_review_page(asin: str, country: str, page: int) -> Optional[dict]:
+    return await _review_pages().find_one({"_id": review_page_id(asin, country, page)})
+
+async def save_review_page(asin: str, country: str, page: int, reviews: List[str], fetched_at: datetime, keep_for: timedelta):
+    await _review_pages().replace_one(
+        {"_id": review_page_id(asin, country, page)},
+        {
+            "asin": asin,
+            "country": country,
+            "page": page,
+            "reviews": reviews,
+            "fetched_at": fetched_at,
+            "expires_at": fetched_at + keep_for
+        },
+        upsert=True
+    )
@@ -1,36 +1,52 @@
-from database.mongo import user_collection
+from database.mongo import async_mongo
+from config.settings import settings
+from utils.user_cache import user_cache
 from typing import Optional
 from bson import ObjectId
 
+def _users():
+    return async_mongo.collection(settings.USERS_COLLECTION)
+
 # Create new user
-def create_user(username: str, email: str, hashed_password: str) -> dict:
+async def create_user(username: str, email: str, hashed_password: str) -> dict:
     user = {
         "username": username,
         "email": email,
         "password": hashed_password
     }
-    result = user_collection.insert_one(user)
+    result = await _users().insert_one(user)
+    user_cache.invalidate(username)
     user["_id"] = str(result.inserted_id)
     return user
 
 # Get user by username
-def get_user_by_username(username: str) -> Optional[dict]:
-    user = user_collection.find_one({"username": username})
+async def get_user_by_username(username: str) -> Optional[dict]:
+    user = await _users().find_one({"username": username})
     if user:
         user["_id"] = str(user["_id"])
     return user
 
-def get_user_by_email(email: str) -> Optional[dict]:
-    user = user_collection.find_one({"email": email})
+async def get_user_principal(username: str) -> Optional[dict]:
+    """The user a token belongs to, without the password hash; served from user_cache"""
+    async def load():
+        user = await _users().find_one({"username": username}, {"password": 0, "analyses": 0})
+        if user:
+            user["_id"] = str(user["_id"])
+        return user
+    return await user_cache.get(username, load)
+
+async def get_user_by_email(email: str) -> Optional[dict]:
+    user = await _users().find_one({"email": email})
     if user:
         user["_id"] = str(user["_id"])
     return user
 
 # Save analysis result
-def save_analysis_result(user_id: str, analysis_data: dict) -> dict:
+async def save_analysis_result(user_id: str, analysis_data: dict) -> dict:
     analysis_data["user_id"] = user_id
-    result = user_collection.update_one(
+    result = await _users().update_one(
         {"_id": ObjectId(user_id)},
         {"$push": {"analyses": analysis_data}}
     )
-    return {"success": result.modified_count > 0}
\ No newline at end of file
+    # analyses is left out of the cached principal, so user_cache needs no invalidation here
+    return {"success": result.modified_count > 0}
@@ -0,0 +1,136 @@
+import asyncio
+from database.mongo import async_mongo
+from datetime import datetime
+from typing import Optional
+import logging
+from pymongo.errors import DuplicateKeyError
+
+# One rollup document per user, keyed by user_id, so the dashboard is a point read.
+# Saves update it with $inc; rebuild_user_stats recomputes it from analysis_history.
+# A save marks itself "pending" before writing its history and clears that in the
+# same $inc that counts it, and every step bumps "writes". A rebuild waits while a
+# save is pending and only replaces the rollup if writes hasn't moved, so an
+# analysis is never counted twice or dropped.
+
+SENTIMENTS = ("positive", "negative", "neutral")
+REBUILD_ATTEMPTS = 5
+REBUILD_RETRY_SECONDS = 0.1
+
+logger = logging.getLogger(__name__)
+
+def _user_stats():
+    return async_mongo.collection("user_stats")
+
+def _analysis_history():
+    return async_mongo.collection("analysis_history")
+
+def count_fake_results(analysis_data: dict) -> int:
+    return sum(1 for result in analysis_data.get("detailed_results") or [] if result.get("is_fake") == "fake")
+
+async def begin_analysis(user_id: str):
+    """Mark a save as pending; call before its history is written, end it with record_analysis or abandon_analysis"""
+    await _user_stats().update_one({"_id": user_id}, {"$inc": {"writes": 1, "pending": 1}}, upsert=True)
+
+async def abandon_analysis(user_id: str):
+    """End a pending save without counting it"""
+    await _user_stats().update_one({"_id": user_id}, {"$inc": {"writes": 1, "pending": -1}})
+
+async def record_analysis(user_id: str, analysis_data: dict, timestamp: datetime):
+    """Add one saved analysis to the user's rollup and end its pending mark"""
+    sentiment_distribution = analysis_data.get("sentiment_distribution") or {}
+    increments = {
+        "writes": 1,
+        "pending": -1,
+        "total_analyses": 1,
+        "fake_reviews_detected": count_fake_results(analysis_data)
+    }
+    for sentiment in SENTIMENTS:
+        increments[f"sentiment_distribution.{sentiment}"] = sentiment_distribution.get(sentiment, 0)
+
+    await _user_stats().update_one(
+        {"_id": user_id},
+        {"$inc": increments, "$max": {"last_analysis_date": timestamp}},
+        upsert=True
+    )
+
+async def get_user_stats(user_id: str) -> Optional[dict]:
+    return await _user_stats().find_one({"_id": user_id})
+
+def _rollup_pipeline(match: dict) -> list:
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": "$user_id",
+            "total_analyses": {"$sum": 1},
+            # Split analyses store their fake count; older ones embed detailed_results
+            "fake_reviews_detected": {"$sum": {"$ifNull": ["$fake_results", {"$size": {"$filter": {
+                "input": {"$ifNull": ["$detailed_results", []]},
+                "cond": {"$eq": ["$$this.is_fake", "fake"]}
+            }}}]}},
+            **{
+                sentiment: {"$sum": {"$ifNull": [f"$sentiment_distribution.{sentiment}", 0]}}
+                for sentiment in SENTIMENTS
+            },
+            "last_analysis_date": {"$max": "$timestamp"}
+        }},
+        {"$project": {
+            "total_analyses": 1,
+            "fake_reviews_detected": 1,
+            "sentiment_distribution": {sentiment: f"${sentiment}" for sentiment in SENTIMENTS},
+            "last_analysis_date": 1,
+            "rebuilt_at": "$$NOW"
+        }}
+    ]
+
+async def _rebuild_one(user_id: str, force: bool = False) -> bool:
+    """Replace one user's rollup, unless saves keep racing with it.
+
+    force ignores pending saves, for marks left behind by a crashed process.
+    """
+    for attempt in range(REBUILD_ATTEMPTS):
+        current = await _user_stats().find_one({"_id": user_id}, {"writes": 1, "pending": 1})
+        writes = current.get("writes") if current else None
+        if current and (current.get("pending") or 0) > 0 and not force:
+            # Its history may already be written but not counted yet
+            await asyncio.sleep(REBUILD_RETRY_SECONDS * (attempt + 1))
+            continue
+
+        docs = await _analysis_history().aggregate(_rollup_pipeline({"user_id": user_id})).to_list(None)
+        # Users whose history is gone get a zeroed rollup rather than a stale one
+        rollup = docs[0] if docs else {
+            "_id": user_id,
+            "total_analyses": 0,
+            "fake_reviews_detected": 0,
+            "sentiment_distribution": {sentiment: 0 for sentiment in SENTIMENTS},
+            "last_analysis_date": None,
+            "rebuilt_at": datetime.utcnow()
+        }
+        rollup["writes"] = writes or 0
+        rollup["pending"] = 0
+
+        if current is None:
+            try:
+                await _user_stats().insert_one(rollup)
+                return True
+            except DuplicateKeyError:
+                continue
+        # Only replaced if no save has bumped writes since it was read
+        result = await _user_stats().replace_one({"_id": user_id, "writes": writes}, rollup)
+        if result.matched_count:
+            return True
+
+    logger.warning(f"⚠️ Dashboard stats for user {user_id} kept changing or had a save pending during rebuild; left as is")
+    return False
+
+async def rebuild_user_stats(user_id: Optional[str] = None, force: bool = False) -> int:
+    """Recompute rollups from analysis_history for one user, or for all; returns the rollups written"""
+    if user_id is not None:
+        return int(await _rebuild_one(user_id, force))
+
+    # Users with a rollup but no history left are rebuilt too, which clears them
+    user_ids = set(await _analysis_history().distinct("user_id", {"user_id": {"$exists": True}}))
+    user_ids.update(await _user_stats().distinct("_id"))
+    written = 0
+    for stats_user_id in user_ids:
+        written += await _rebuild_one(stats_user_id, force)
+    return written
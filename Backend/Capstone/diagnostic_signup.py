@@ -1,12 +1,18 @@
+import asyncio
 import sys
 import logging
-from database.mongo import user_collection, ping_mongo, db, client
+from config.settings import settings
+from database.mongo import async_mongo, get_database, ping_mongo
 from database.user_db import create_user, get_user_by_username
 from utils.auth_utils import hash_password
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+db = get_database()
+client = db.client
+user_collection = db[settings.USERS_COLLECTION]
+
 print("="*60)
 print("🔍 SIGNUP DIAGNOSTIC TEST")
 print("="*60)
@@ -57,9 +63,11 @@ test_username = "diagnostic_test_user"
 test_email = "test@diagnostic.com"
 test_password = "TestPassword123"
 
-try:
+async def test_user_creation():
+    async_mongo.start()
+    
     # Check if test user already exists
-    existing = get_user_by_username(test_username)
+    existing = await get_user_by_username(test_username)
     if existing:
         print(f"   ℹ️  Test user already exists, deleting...")
         user_collection.delete_one({"username": test_username})
@@ -70,12 +78,12 @@ try:
     
     # Create user
     print(f"   🔄 Attempting to create user '{test_username}'...")
-    new_user = create_user(test_username, test_email, hashed_pw)
+    new_user = await create_user(test_username, test_email, hashed_pw)
     print(f"   ✅ User created! ID: {new_user['_id']}")
     
     # Verify it was actually inserted
     print(f"   🔄 Verifying user was stored...")
-    found = get_user_by_username(test_username)
+    found = await get_user_by_username(test_username)
     
     if found:
         print(f"   ✅ SUCCESS! User found in database:")
@@ -89,7 +97,10 @@ try:
     else:
         print(f"   ❌ FAIL! User was not found after creation!")
         print(f"   This means insert_one() returned success but data didn't persist")
-        
+    async_mongo.close()
+
+try:
+    asyncio.run(test_user_creation())
 except Exception as e:
     print(f"   ❌ Error during test: {e}")
     import traceback
@@ -1,11 +1,23 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from database.mongo import ping_mongo
+from fastapi.responses import JSONResponse, Response
+from config.settings import settings
+from database.mongo import async_mongo, ensure_indexes
 from routes import auth, analyze_url, analyze_text, demo, user_data
 from utils.model_loader import model_loader
+from utils.prediction import review_analyzer
+from utils.http_client import http_client
+from utils.review_cache import review_cache
+from utils.user_cache import user_cache
+from utils.inference_service import inference_service
+from utils.lexicon_sentiment import lexicon_sentiment
+from utils.metrics import MetricsMiddleware, metrics
 import logging
 import uvicorn
 from routes import contact
+from routes import models
 
 
 # Configure logging
@@ -33,6 +45,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics; added last so it also times the CORS middleware
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(analyze_url.router)
@@ -40,18 +56,53 @@ app.include_router(analyze_text.router)
 app.include_router(demo.router)
 app.include_router(contact.router)
 app.include_router(user_data.router)
+app.include_router(models.router)
+
+
+async def connect_database():
+    """Check MongoDB and create indexes without holding up startup"""
+    try:
+        await async_mongo.ping()
+        logger.info("✅ MongoDB connection established")
+        await ensure_indexes()
+        await review_cache.ensure_indexes()
+    except Exception as e:
+        logger.error(f"❌ MongoDB unavailable at startup: {str(e)}")
+
+async def warm_up_models():
+    """Load ML models in the background, then start the scoring pool"""
+    try:
+        await run_in_threadpool(model_loader.load_models)
+        logger.info("✅ ML models initialized")
+        
+        # Compile the fallback sentiment lexicon before the first request needs it
+        if not model_loader.has_model("sentiment"):
+            await run_in_threadpool(lexicon_sentiment.load)
+        
+        # A process pool waits for its workers to load models; keep that off the loop
+        await run_in_threadpool(inference_service.start)
+        logger.info("🚀 Models warm, application fully ready")
+    except Exception as e:
+        logger.error(f"❌ Model warm-up failed: {str(e)}")
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
     try:
-        # Test MongoDB connection
-        ping_mongo()
-        logger.info("✅ MongoDB connection established")
+        # Open the pooled HTTP client for RapidAPI requests
+        await http_client.start()
         
-        # Load ML models
-        model_loader.load_models()
-        logger.info("✅ ML models initialized")
+        # Open the MongoDB pool inside the event loop
+        async_mongo.start()
+        
+        # Database checks and model loading run in the background; until models
+        # are warm, scoring waits briefly and then uses the fallbacks
+        model_loader.begin_loading()
+        app.state.warmup_tasks = [
+            asyncio.ensure_future(connect_database()),
+            asyncio.ensure_future(warm_up_models())
+        ]
         
         logger.info("🚀 Application startup completed successfully")
         
@@ -61,9 +112,14 @@ async def startup_event():
 
 # Shutdown event
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🛑 Application shutting down")
+    for task in getattr(app.state, "warmup_tasks", []):
+        task.cancel()
+    await http_client.close()
+    async_mongo.close()
+    inference_service.shutdown()
 
 # Root endpoint
 @app.get("/")
@@ -83,17 +139,37 @@ def read_root():
 
 # Health check endpoint
 @app.get("/health")
-def health_check():
-    """Health check endpoint"""
+async def health_check():
+    """Liveness check: the process is up, with the state of each dependency"""
+    database_up = await async_mongo.check(settings.HEALTH_DB_TIMEOUT_SECONDS)
     return {
-        "status": "healthy",
+        "status": "healthy" if database_up else "degraded",
         "services": {
-            "database": "connected",
-            "ml_models": "loaded" if model_loader.is_ready() else "not_loaded",
+            "database": "connected" if database_up else "unreachable",
+            "ml_models": "loaded" if model_loader.is_ready() else ("loading" if model_loader.is_loading() else "not_loaded"),
             "api": "running"
         }
     }
 
+# Readiness probe
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 503 until background model loading has finished"""
+    body = {
+        "ready": model_loader.is_warm(),
+        "status": model_loader.status,
+        "models": model_loader.model_states
+    }
+    if not body["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+# Prometheus scrape endpoint
+if metrics.enabled:
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return Response(content=metrics.render(), headers={"Content-Type": metrics.content_type})
+
 # API status endpoint
 @app.get("/status")
 def api_status():
@@ -113,10 +189,21 @@ def api_status():
         },
         "models": {
             "ready": model_loader.is_ready(),
-            "fake_detection": "svm_model" if model_loader.fake_detection_model else "heuristic_fallback",
-            "sentiment_analysis": "svm_model" if model_loader.sentiment_model else "textblob_fallback",
-            "categorization": "loaded" if model_loader.category_model else "keyword_based"
-        }
+            "status": model_loader.status,
+            "states": model_loader.model_states,
+            "load_seconds": model_loader.load_seconds,
+            "fake_detection": "svm_model" if model_loader.has_model("fake") else "heuristic_fallback",
+            "sentiment_analysis": "svm_model" if model_loader.has_model("sentiment") else "lexicon_fallback",
+            "categorization": "loaded" if model_loader.category_model else "keyword_based",
+            "version": model_loader.model_version
+        },
+        "prediction_cache": review_analyzer.prediction_cache.stats(),
+        "http_pool": http_client.stats(),
+        "database_pool": async_mongo.stats(),
+        "review_cache": review_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "inference": inference_service.stats(),
+        "model_slots": model_loader.slots_stats()
     }
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
@@ -45,6 +45,7 @@ class SingleReviewAnalysis(BaseModel):
     sentiment_score: float
     category: CategoryType
     confidence_score: float
+    cluster_id: Optional[int] = None  # Index of the first near-duplicate of this review in the results
 
 class AnalysisResponse(BaseModel):
     total_reviews: int
@@ -59,4 +60,11 @@ class AnalysisResponse(BaseModel):
 class ContactFormInput(BaseModel):
     name: str
     email: EmailStr
-    message: str
\ No newline at end of file
+    message: str
+
+class ModelReloadRequest(BaseModel):
+    version_dir: Optional[str] = None  # Subdirectory of ml_models holding the new version
+    traffic: Optional[float] = Field(None, ge=0, le=1)  # Set to load as an A/B candidate
+
+class ModelTrafficRequest(BaseModel):
+    traffic: float = Field(..., ge=0, le=1)
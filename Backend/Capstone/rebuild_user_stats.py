@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+
+import asyncio
+import sys
+sys.path.append('.')
+from database.mongo import async_mongo
+from database.user_stats_db import rebuild_user_stats
+
+# Recompute the dashboard rollups (user_stats) from analysis_history.
+# Run once after deploying the rollups, and again if they ever drift.
+# --force also rebuilds users whose saves are still marked pending, e.g. after a crash.
+async def rebuild(user_id: str = None, force: bool = False):
+    async_mongo.start()
+    written = await rebuild_user_stats(user_id, force)
+    async_mongo.close()
+    if user_id:
+        print(f"Rebuilt dashboard stats for user {user_id}" if written else f"Dashboard stats for user {user_id} were not rebuilt")
+    else:
+        print(f"Rebuilt dashboard stats for {written} users")
+
+if __name__ == "__main__":
+    # Usage: python rebuild_user_stats.py [--force] [user_id]
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    asyncio.run(rebuild(args[0] if args else None, "--force" in sys.argv[1:]))
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from models.schemas import TextAnalysisInput, AnalysisResponse
 from models.response_models import StandardResponse
-from utils.prediction import review_analyzer
+from utils.inference_service import inference_service
+from utils.streaming import NDJSON_MEDIA_TYPE, iter_review_list, stream_review_analysis
 from utils.auth_utils import get_current_user
 from database.user_db import get_user_by_username
 import logging
@@ -10,7 +12,7 @@ router = APIRouter(prefix="/text", tags=["Text Analysis"])
 logger = logging.getLogger(__name__)
 
 @router.post("/analyze", response_model=AnalysisResponse)
-def analyze_text_reviews(data: TextAnalysisInput, current_user: str = Depends(get_current_user)):
+async def analyze_text_reviews(data: TextAnalysisInput, current_user: str = Depends(get_current_user)):
     """Analyze provided text reviews for fake detection, sentiment, and categorization"""
     try:
         # Validate input
@@ -30,7 +32,7 @@ def analyze_text_reviews(data: TextAnalysisInput, current_user: str = Depends(ge
         
         # Perform analysis
         logger.info(f"Analyzing {len(clean_reviews)} reviews for user {current_user}")
-        analysis_result = review_analyzer.analyze_reviews(clean_reviews)
+        analysis_result = await inference_service.analyze_reviews(clean_reviews)
         
         return AnalysisResponse(**analysis_result)
         
@@ -40,8 +42,30 @@ def analyze_text_reviews(data: TextAnalysisInput, current_user: str = Depends(ge
         logger.error(f"Error in analyze_text_reviews: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error during analysis")
 
+@router.post("/analyze-stream")
+def analyze_text_reviews_stream(data: TextAnalysisInput, current_user: str = Depends(get_current_user)):
+    """Stream per-review results as NDJSON, ending with a summary record"""
+    if not data.reviews or len(data.reviews) == 0:
+        raise HTTPException(status_code=400, detail="No reviews provided")
+    
+    clean_reviews = [review.strip() for review in data.reviews if review and review.strip()]
+    
+    if not clean_reviews:
+        raise HTTPException(status_code=400, detail="No valid reviews found after cleaning")
+    
+    # Limit number of reviews to prevent overload
+    if len(clean_reviews) > 100:
+        clean_reviews = clean_reviews[:100]
+        logger.warning(f"Limited streaming analysis to first 100 reviews for user {current_user}")
+    
+    logger.info(f"Streaming analysis of {len(clean_reviews)} reviews for user {current_user}")
+    return StreamingResponse(
+        stream_review_analysis(iter_review_list(clean_reviews)),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
 @router.post("/quick-analysis")
-def quick_analysis(data: TextAnalysisInput, current_user: str = Depends(get_current_user)):
+async def quick_analysis(data: TextAnalysisInput, current_user: str = Depends(get_current_user)):
     """Quick analysis returning just summary statistics"""
     try:
         if not data.reviews:
@@ -54,7 +78,7 @@ def quick_analysis(data: TextAnalysisInput, current_user: str = Depends(get_curr
         
         # Perform quick analysis (limit to 50 reviews for speed)
         sample_reviews = clean_reviews[:50]
-        analysis_result = review_analyzer.analyze_reviews(sample_reviews)
+        analysis_result = await inference_service.analyze_reviews(sample_reviews)
         
         # Return just summary statistics
         summary = {
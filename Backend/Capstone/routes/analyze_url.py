@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from models.schemas import ReviewInput, AnalysisResponse
 from models.response_models import ReviewFetchResponse, StandardResponse
-from utils.api_connector import fetch_reviews_from_amazon, extract_asin_from_url
-from utils.prediction import review_analyzer
+from utils.api_connector import fetch_reviews_from_amazon, iter_reviews_from_amazon, extract_asin_from_url
+from utils.inference_service import inference_service
 from utils.auth_utils import get_current_user
+from utils.streaming import NDJSON_MEDIA_TYPE, stream_review_analysis
 from typing import List
 import logging
 
@@ -11,7 +13,7 @@ router = APIRouter(prefix="/analyze", tags=["URL Analysis"])
 logger = logging.getLogger(__name__)
 
 @router.post("/fetch-reviews", response_model=ReviewFetchResponse)
-def fetch_reviews(data: ReviewInput, current_user: str = Depends(get_current_user)):
+async def fetch_reviews(data: ReviewInput, current_user: str = Depends(get_current_user)):
     """Fetch reviews from Amazon URL or accept manual reviews"""
     try:
         all_reviews = []
@@ -22,7 +24,7 @@ def fetch_reviews(data: ReviewInput, current_user: str = Depends(get_current_use
             try:
                 asin = extract_asin_from_url(data.product_url)
                 logger.info(f"Extracted ASIN: {asin}")
-                url_reviews = fetch_reviews_from_amazon(asin)
+                url_reviews = await fetch_reviews_from_amazon(asin)
                 all_reviews.extend(url_reviews)
                 source = "url" if not data.manual_reviews else "mixed"
                 logger.info(f"Fetched {len(url_reviews)} reviews from URL")
@@ -64,7 +66,7 @@ def fetch_reviews(data: ReviewInput, current_user: str = Depends(get_current_use
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/complete-analysis", response_model=AnalysisResponse)
-def complete_analysis(data: ReviewInput, current_user: str = Depends(get_current_user)):
+async def complete_analysis(data: ReviewInput, current_user: str = Depends(get_current_user)):
     """Perform complete analysis: fetch reviews + analyze them"""
     try:
         # First fetch reviews using the existing endpoint logic
@@ -73,7 +75,7 @@ def complete_analysis(data: ReviewInput, current_user: str = Depends(get_current
         if data.product_url:
             try:
                 asin = extract_asin_from_url(data.product_url)
-                url_reviews = fetch_reviews_from_amazon(asin)
+                url_reviews = await fetch_reviews_from_amazon(asin)
                 all_reviews.extend(url_reviews)
             except ValueError as ve:
                 raise HTTPException(status_code=400, detail=str(ve))
@@ -88,8 +90,8 @@ def complete_analysis(data: ReviewInput, current_user: str = Depends(get_current
         # Remove duplicates
         unique_reviews = list(dict.fromkeys(all_reviews))
         
-        # Analyze reviews
-        analysis_result = review_analyzer.analyze_reviews(unique_reviews)
+        # Analyze reviews on the inference pool
+        analysis_result = await inference_service.analyze_reviews(unique_reviews)
         
         return AnalysisResponse(**analysis_result)
         
@@ -98,13 +100,37 @@ def complete_analysis(data: ReviewInput, current_user: str = Depends(get_current
     except Exception as e:
         logger.error(f"Error in complete_analysis: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/complete-analysis-stream")
+def complete_analysis_stream(data: ReviewInput, current_user: str = Depends(get_current_user)):
+    """Stream complete analysis as NDJSON: each page is scored while the next one downloads"""
+    asin = None
+    if data.product_url:
+        try:
+            asin = extract_asin_from_url(data.product_url)
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+    
+    manual_reviews = [review.strip() for review in (data.manual_reviews or []) if review.strip()]
+    
+    if not asin and not manual_reviews:
+        raise HTTPException(status_code=400, detail="No valid reviews found or provided.")
+    
+    async def review_batches():
+        if asin:
+            async for page_reviews in iter_reviews_from_amazon(asin):
+                yield page_reviews
+        if manual_reviews:
+            yield manual_reviews
+    
+    return StreamingResponse(stream_review_analysis(review_batches()), media_type=NDJSON_MEDIA_TYPE)
     
 @router.get("/test-api")
-def test_rapidapi_connection(current_user: str = Depends(get_current_user)):
+async def test_rapidapi_connection(current_user: str = Depends(get_current_user)):
     """Test RapidAPI connection"""
     from utils.api_connector import test_api_connection
     
-    result = test_api_connection()
+    result = await test_api_connection()
     return StandardResponse(
         success=result["success"],
         message="API connection test completed",
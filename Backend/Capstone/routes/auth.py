@@ -1,23 +1,25 @@
 from fastapi import APIRouter, HTTPException, Depends,Header
+from fastapi.concurrency import run_in_threadpool
 from models.schemas import SignupUser, LoginUser
 from models.response_models import AuthResponse, StandardResponse
-from utils.auth_utils import hash_password, verify_password, create_access_token, get_current_user
+from utils.auth_utils import hash_password, verify_password, create_access_token, get_current_user, get_current_principal
 from database.user_db import create_user, get_user_by_username, get_user_by_email
 from datetime import timedelta
+from pymongo.errors import DuplicateKeyError
 from config.settings import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/signup", response_model=StandardResponse)
-def signup(user: SignupUser):
+async def signup(user: SignupUser):
     """User registration endpoint"""
     try:
         # Check if username already exists
-        if get_user_by_username(user.username):
+        if await get_user_by_username(user.username):
             raise HTTPException(status_code=400, detail="Username already exists")
         
         # Check if email already exists
-        if get_user_by_email(user.email):
+        if await get_user_by_email(user.email):
             raise HTTPException(status_code=400, detail="Email already exists")
         
          # Validate password length for bcrypt limitation
@@ -25,8 +27,9 @@ def signup(user: SignupUser):
             raise HTTPException(status_code=400, detail="Password too long (must be 72 bytes or fewer)")
         
         # Hash password and create user
-        hashed_pw = hash_password(user.password)
-        new_user = create_user(user.username, user.email, hashed_pw)
+        # bcrypt is deliberately slow; keep it off the event loop
+        hashed_pw = await run_in_threadpool(hash_password, user.password)
+        new_user = await create_user(user.username, user.email, hashed_pw)
         
         return StandardResponse(
             success=True,
@@ -36,11 +39,14 @@ def signup(user: SignupUser):
         
     except HTTPException:
         raise
+    except DuplicateKeyError:
+        # A concurrent signup took the username or email after the checks above
+        raise HTTPException(status_code=400, detail="Username or email already exists")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/login", response_model=AuthResponse)
-def login(user: LoginUser):
+async def login(user: LoginUser):
     """User login endpoint"""
     try:
 
@@ -49,14 +55,14 @@ def login(user: LoginUser):
             raise HTTPException(status_code=400, detail="Password too long (must be 72 bytes or fewer)")
         
         # Try to find user by username first
-        db_user = get_user_by_username(user.identifier)
+        db_user = await get_user_by_username(user.identifier)
         
         # If not found, try finding by email
         if not db_user:
-            db_user = get_user_by_email(user.identifier)
+            db_user = await get_user_by_email(user.identifier)
         
         # Validate credentials
-        if not db_user or not verify_password(user.password, db_user["password"]):
+        if not db_user or not await run_in_threadpool(verify_password, user.password, db_user["password"]):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
         # Create access token
@@ -78,13 +84,9 @@ def login(user: LoginUser):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/me", response_model=StandardResponse)
-def get_current_user_info(current_user: str = Depends(get_current_user)):
+async def get_current_user_info(user: dict = Depends(get_current_principal)):
     """Get current user information"""
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         return StandardResponse(
             success=True,
             message="User information retrieved successfully",
@@ -110,13 +112,9 @@ def secure_route(current_user: str = Depends(get_current_user)):
     )
 
 @router.get("/profile", response_model=StandardResponse)
-def get_user_profile(current_user: str = Depends(get_current_user)):
+async def get_user_profile(user: dict = Depends(get_current_principal)):
     """Get detailed user profile information"""
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         # You can add additional profile data here in the future
         return StandardResponse(
             success=True,
@@ -152,13 +150,9 @@ def verify_token(current_user: str = Depends(get_current_user)):
     )
 
 @router.post("/refresh-token", response_model=AuthResponse)
-def refresh_access_token(current_user: str = Depends(get_current_user)):
+async def refresh_access_token(user: dict = Depends(get_current_principal)):
     """Refresh an access token before it expires"""
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         # Create new access token with extended expiry
         token = create_access_token(
             data={"sub": user["username"]}, 
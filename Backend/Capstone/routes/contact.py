@@ -15,7 +15,7 @@ async def submit_contact_form(
 
     try:
         # Add username to the saved message
-        message_id = save_contact_message(
+        message_id = await save_contact_message(
             form_data.name,
             form_data.email, 
             form_data.message,
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Request
 from models.schemas import TextAnalysisInput, AnalysisResponse, ReviewInput
-from utils.prediction import review_analyzer
+from utils.inference_service import inference_service
 from utils.api_connector import fetch_reviews_from_amazon, extract_asin_from_url
 import logging
 from datetime import datetime, timedelta
@@ -49,13 +49,15 @@ async def demo_analyze_text(data: TextAnalysisInput, request: Request):
         )
     
     try:
-        results = review_analyzer.analyze_reviews(data.reviews)
+        results = await inference_service.analyze_reviews(data.reviews)
         remaining_tries = 3 - demo_attempts[client_ip]["count"]
         
         return {
             **results,
             "message": f"Demo analysis complete. {remaining_tries} tries remaining."
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Demo analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail="Analysis failed")
@@ -79,7 +81,7 @@ async def demo_analyze_url(data: ReviewInput, request: Request):
         reviews = []
         if data.product_url:
             asin = extract_asin_from_url(data.product_url)
-            reviews.extend(fetch_reviews_from_amazon(asin, max_pages=1))
+            reviews.extend(await fetch_reviews_from_amazon(asin, max_pages=1))
         
         if data.manual_reviews:
             reviews.extend(data.manual_reviews)
@@ -87,13 +89,15 @@ async def demo_analyze_url(data: ReviewInput, request: Request):
         if not reviews:
             raise HTTPException(status_code=400, detail="No reviews found")
         
-        results = review_analyzer.analyze_reviews(reviews)
+        results = await inference_service.analyze_reviews(reviews)
         remaining_tries = 3 - demo_attempts[client_ip]["count"]
         
         return {
             **results,
             "message": f"Demo analysis complete. {remaining_tries} tries remaining."
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Demo URL analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail="Analysis failed")
\ No newline at end of file
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from models.schemas import ModelReloadRequest, ModelTrafficRequest
+from models.response_models import StandardResponse
+from utils.auth_utils import require_model_admin
+from utils.model_loader import model_loader
+from utils.inference_service import inference_service
+from config.settings import settings
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/models", tags=["Model Administration"], dependencies=[Depends(require_model_admin)])
+
+def resolve_version_dir(version_dir: str) -> str:
+    """Map a version name to its directory, which must sit inside MODELS_DIR"""
+    models_root = os.path.realpath(settings.MODELS_DIR)
+    models_dir = os.path.realpath(os.path.join(models_root, version_dir))
+    if not models_dir.startswith(models_root + os.sep) or not os.path.isdir(models_dir):
+        raise HTTPException(status_code=400, detail=f"Unknown model version directory: {version_dir}")
+    return models_dir
+
+@router.get("/", response_model=StandardResponse)
+def get_model_slots():
+    """Active and candidate model versions with their per-version counters"""
+    return StandardResponse(success=True, message="Model slots", data=model_loader.slots_stats())
+
+@router.post("/reload", response_model=StandardResponse)
+async def reload_models(request: ModelReloadRequest):
+    """Load a model version in the background and swap it in without a restart"""
+    models_dir = bundle_dir = None
+    if request.version_dir:
+        models_dir = resolve_version_dir(request.version_dir)
+        bundle_dir = os.path.join(models_dir, "bundle")
+    
+    try:
+        slot = await run_in_threadpool(model_loader.reload_models, models_dir, bundle_dir, request.traffic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error reloading models: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reload models")
+    
+    # Workers only load the slots that existed when they started
+    await run_in_threadpool(inference_service.recycle)
+    
+    role = "active" if request.traffic is None else "candidate"
+    return StandardResponse(
+        success=True,
+        message=f"Model version {slot.model_version} loaded as {role}",
+        data=model_loader.slots_stats()
+    )
+
+@router.post("/promote", response_model=StandardResponse)
+async def promote_candidate():
+    """Send all traffic to the candidate version"""
+    try:
+        slot = model_loader.promote_candidate()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await run_in_threadpool(inference_service.recycle)
+    return StandardResponse(success=True, message=f"Model version {slot.model_version} is now active", data=model_loader.slots_stats())
+
+@router.post("/traffic", response_model=StandardResponse)
+async def set_candidate_traffic(request: ModelTrafficRequest):
+    """Change the share of batches routed to the candidate version"""
+    try:
+        model_loader.set_candidate_traffic(request.traffic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StandardResponse(success=True, message=f"Candidate traffic set to {request.traffic:.0%}", data=model_loader.slots_stats())
+
+@router.delete("/candidate", response_model=StandardResponse)
+async def drop_candidate():
+    """Stop routing traffic to the candidate version and unload it"""
+    model_loader.drop_candidate()
+    await run_in_threadpool(inference_service.recycle)
+    return StandardResponse(success=True, message="Candidate model version removed", data=model_loader.slots_stats())
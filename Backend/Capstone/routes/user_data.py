@@ -1,69 +1,111 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from models.schemas import AnalysisResponse
 from models.response_models import StandardResponse
-from utils.auth_utils import get_current_user
-from database.user_db import get_user_by_username
+from utils.auth_utils import get_current_principal
+from database.analysis_db import attach_all_details, find_user_analysis, find_user_history, get_analysis_details, save_analysis
+from database.user_stats_db import abandon_analysis, begin_analysis, get_user_stats, rebuild_user_stats, record_analysis
 import logging
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-import pymongo
 from bson import ObjectId
 
-from database.mongo import get_database, analysis_history
-
 router = APIRouter(prefix="/user", tags=["User Data"])
 logger = logging.getLogger(__name__)
 
 @router.post("/save-analysis", response_model=StandardResponse)
-def save_analysis_to_history(
+async def save_analysis_to_history(
     analysis: AnalysisResponse, 
-    current_user: str = Depends(get_current_user)
+    user: dict = Depends(get_current_principal)
 ):
     """Save analysis result to user history"""
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         # Convert pydantic model to dict and add metadata
         analysis_data = analysis.dict()
         analysis_data["user_id"] = str(user["_id"])
         analysis_data["timestamp"] = datetime.utcnow()
         
-        # Store directly in analysis_history collection
-        result = analysis_history.insert_one(analysis_data)
+        # Tells a concurrent rollup rebuild to wait until this analysis is counted
+        await begin_analysis(analysis_data["user_id"])
+        
+        # Summary in analysis_history, per-review rows and texts in their own collections
+        try:
+            analysis_id = await save_analysis(analysis_data)
+        except Exception:
+            await release_analysis(analysis_data["user_id"])
+            raise
+        
+        # Keep the dashboard rollup in step; rebuild_user_stats.py repairs any drift
+        try:
+            await record_analysis(analysis_data["user_id"], analysis_data, analysis_data["timestamp"])
+        except Exception as e:
+            logger.error(f"Error updating dashboard stats: {str(e)}")
+            await release_analysis(analysis_data["user_id"])
         
         return StandardResponse(
             success=True,
             message="Analysis saved to history",
-            data={"analysis_id": str(result.inserted_id)}
+            data={"analysis_id": analysis_id}
         )
     except Exception as e:
         logger.error(f"Error saving analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to save analysis: {str(e)}")
 
+async def release_analysis(user_id: str):
+    """End a pending save's mark on the rollup; failures are logged, the rollup can be rebuilt"""
+    try:
+        await abandon_analysis(user_id)
+    except Exception as e:
+        logger.error(f"Error clearing pending dashboard stats: {str(e)}")
+
+def encode_history_cursor(doc: dict) -> str:
+    """Position after doc in a newest-first history listing"""
+    return f"{doc['timestamp'].isoformat()}_{doc['_id']}"
+
+def decode_history_cursor(cursor: str) -> dict:
+    """Query filter for the history entries that come after cursor"""
+    try:
+        timestamp, analysis_id = cursor.rsplit("_", 1)
+        timestamp = datetime.fromisoformat(timestamp)
+        analysis_id = ObjectId(analysis_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+    return {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "_id": {"$lt": analysis_id}}
+    ]}
+
 @router.get("/analysis-history", response_model=StandardResponse)
-def get_analysis_history(
-    limit: int = 10, 
-    skip: int = 0,
-    current_user: str = Depends(get_current_user)
+async def get_analysis_history(
+    limit: int = Query(10, ge=1, le=100),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    include_details: bool = False,
+    user: dict = Depends(get_current_principal)
 ):
-    """Get user's analysis history"""
+    """Get user's analysis history, newest first.
+
+    Pass the returned next_cursor as cursor to get the following page;
+    skip still works but gets slower the further it goes. Entries are
+    summaries with a preview_text; detailed_results are only included
+    when include_details is set (or fetched per analysis from /details).
+    """
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Query for this user's analysis history - use analysis_history directly
-        cursor = analysis_history.find(
-            {"user_id": str(user["_id"])}
-        ).sort(
-            "timestamp", -1
-        ).skip(skip).limit(limit)
+        # One extra row tells whether another page exists
+        after = decode_history_cursor(cursor) if cursor else None
+        docs = await find_user_history(str(user["_id"]), after, include_details, 0 if cursor else skip, limit + 1)
+        next_cursor = encode_history_cursor(docs[limit - 1]) if len(docs) > limit else None
+        docs = docs[:limit]
+        if include_details:
+            await attach_all_details(docs)
         
         # Convert to list and sanitize ObjectId fields
         history = []
-        for doc in cursor:
+        for doc in docs:
+            if "preview_text" not in doc:
+                embedded = doc.get("detailed_results") or [{}]
+                doc["preview_text"] = embedded[0].get("review_text")
+            if not include_details:
+                doc.pop("detailed_results", None)
             doc["_id"] = str(doc["_id"])
             # Convert datetime objects to strings for JSON serialization
             if "timestamp" in doc and isinstance(doc["timestamp"], datetime):
@@ -73,76 +115,68 @@ def get_analysis_history(
         return StandardResponse(
             success=True,
             message="Analysis history retrieved",
-            data={"history": history, "total": len(history)}
+            data={"history": history, "total": len(history), "next_cursor": next_cursor}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving analysis history: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve analysis history: {str(e)}")
 
-@router.get("/dashboard-stats", response_model=StandardResponse)
-def get_dashboard_stats(current_user: str = Depends(get_current_user)):
-    """Get user's dashboard statistics"""
+@router.get("/analysis-history/{analysis_id}/details", response_model=StandardResponse)
+async def get_analysis_history_details(
+    analysis_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    user: dict = Depends(get_current_principal)
+):
+    """Get the per-review results of one saved analysis, in their original order"""
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Count total analyses - use analysis_history directly
-        total_analyses = analysis_history.count_documents({
-            "user_id": str(user["_id"])
-        })
-        
-        # Count fake reviews detected
-        fake_reviews_count = 0
-        analyses = analysis_history.find({"user_id": str(user["_id"])})
-        for analysis in analyses:
-            if "detailed_results" in analysis:
-                fake_reviews_count += sum(
-                    1 for result in analysis["detailed_results"] 
-                    if result.get("is_fake") == "fake"
-                )
-        
-        # Get sentiment distribution
-        positive_count = 0
-        negative_count = 0
-        neutral_count = 0
+        analysis = await find_user_analysis(str(user["_id"]), analysis_id)
+        if not analysis:
+            raise HTTPException(status_code=404, detail="Analysis not found")
         
-        analyses = analysis_history.find({"user_id": str(user["_id"])})
-        for analysis in analyses:
-            if "sentiment_distribution" in analysis:
-                positive_count += analysis["sentiment_distribution"].get("positive", 0)
-                negative_count += analysis["sentiment_distribution"].get("negative", 0)
-                neutral_count += analysis["sentiment_distribution"].get("neutral", 0)
+        detailed_results = await get_analysis_details(analysis, skip, limit)
+        total = analysis.get("detail_count", len(analysis.get("detailed_results", [])))
         
-        sentiment_distribution = {
-            "positive": positive_count,
-            "negative": negative_count,
-            "neutral": neutral_count
-        }
+        return StandardResponse(
+            success=True,
+            message="Analysis details retrieved",
+            data={"analysis_id": analysis_id, "detailed_results": detailed_results, "total": total}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving analysis details: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve analysis details: {str(e)}")
+
+@router.get("/dashboard-stats", response_model=StandardResponse)
+async def get_dashboard_stats(user: dict = Depends(get_current_principal)):
+    """Get user's dashboard statistics"""
+    try:
+        # Read the precomputed rollup; build it from history the first time
+        stats = await get_user_stats(str(user["_id"]))
+        if stats is None or "rebuilt_at" not in stats:
+            await rebuild_user_stats(str(user["_id"]))
+            stats = await get_user_stats(str(user["_id"]))
         
-        # Get last analysis date
-        last_analysis = get_last_analysis_date(str(user["_id"]))
+        sentiment_distribution = stats.get("sentiment_distribution", {})
+        last_analysis = stats.get("last_analysis_date")
         
         return StandardResponse(
             success=True,
             message="Dashboard stats retrieved",
             data={
-                "total_analyses": total_analyses,
-                "fake_reviews_detected": fake_reviews_count,
-                "sentiment_distribution": sentiment_distribution,
+                "total_analyses": stats.get("total_analyses", 0),
+                "fake_reviews_detected": stats.get("fake_reviews_detected", 0),
+                "sentiment_distribution": {
+                    "positive": sentiment_distribution.get("positive", 0),
+                    "negative": sentiment_distribution.get("negative", 0),
+                    "neutral": sentiment_distribution.get("neutral", 0)
+                },
                 "last_analysis_date": last_analysis.isoformat() if last_analysis else None
             }
         )
     except Exception as e:
         logger.error(f"Error retrieving dashboard stats: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve dashboard statistics: {str(e)}")
-
-def get_last_analysis_date(user_id):
-    """Helper to get the date of last analysis"""
-    last_analysis = analysis_history.find_one(
-        {"user_id": str(user_id)},
-        sort=[("timestamp", -1)]
-    )
-    
-    return last_analysis["timestamp"] if last_analysis and "timestamp" in last_analysis else None
-
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('.')
+from utils.model_loader import model_loader
+from utils.prediction import review_analyzer
+
+# Checks that analyze_reviews scores near-duplicate reviews on their own text:
+# only identical reviews may share scores, cluster_id is just a marker
+
+NEAR_DUPLICATE_PAIRS = [
+    (
+        "Works exactly as described, very happy with it overall.",
+        "Works exactly as described, not happy with it overall."
+    ),
+    (
+        "Fantastic product! Will buy again.",
+        "fantastic product, will buy again"
+    ),
+    (
+        "Great quality and fast delivery, I would recommend this seller.",
+        "Great quality and fast delivery, I would not recommend this seller."
+    ),
+]
+
+SCORE_FIELDS = ("is_fake", "sentiment", "sentiment_score", "category", "confidence_score")
+
+def scores(analysis) -> tuple:
+    return tuple(getattr(analysis, field) for field in SCORE_FIELDS)
+
+def run_duplicate_checks() -> bool:
+    ok = True
+    for first, second in NEAR_DUPLICATE_PAIRS:
+        results = review_analyzer.analyze_reviews([first, second, first])["detailed_results"]
+        for review, analysis in zip((first, second), results):
+            expected = review_analyzer.analyze_batch([review])[0]
+            if scores(analysis) != scores(expected):
+                print(f"MISMATCH {review!r}: got {scores(analysis)}, scored alone {scores(expected)}")
+                ok = False
+        if scores(results[2]) != scores(results[0]):
+            print(f"MISMATCH identical copies of {first!r} scored differently")
+            ok = False
+        print(f"{first!r} / {second!r}: cluster ids {[analysis.cluster_id for analysis in results]}")
+    return ok
+
+if __name__ == "__main__":
+    # Usage: python test_duplicate_scoring.py
+    model_loader.load_models()
+    if run_duplicate_checks():
+        print("Near-duplicate reviews are scored on their own text")
+    else:
+        print("Duplicate scoring check FAILED")
+        sys.exit(1)
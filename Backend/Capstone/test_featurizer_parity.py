@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import tempfile
+sys.path.append('.')
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from config.settings import settings
+from utils.model_bundle import load_model_bundle, save_model_bundle
+from utils.model_loader import ModelSlot
+from utils.text_features import SharedFeaturizer
+
+# Checks that the inference featurizer (plain, bundled and de-duplicated)
+# reproduces vectorizer.transform() for the saved vectorizers and a range of settings
+
+SAMPLE_TEXTS = [
+    "Fantastic product! Will buy again.",
+    "fantastic product will buy again",
+    "Terrible quality, broke after two days. Never again!!!",
+    "The delivery was fast and the packaging was good good good",
+    "Café crème brûlée naïve façade — déjà vu",
+    "ÜBER-cool gadget; works 100% as described :)",
+    "Price is OK, value for money is great. 5/5",
+    "a b c d e",
+    "",
+    "!!!",
+    "don't won't can't shouldn't",
+    "Ünïcödé ẞtraße İstanbul ǅ",
+    "word " * 50,
+    "新しい 製品 は 素晴らしい",
+]
+
+TRAIN_TEXTS = SAMPLE_TEXTS[:8] + [
+    "good product great price fast delivery",
+    "bad product poor quality slow delivery",
+    "cafe creme works as described",
+    "never buying this again waste of money",
+]
+
+# Vectorizer settings beyond the saved models' (1, 2)-gram word analyzer
+VARIANTS = {
+    "unigrams": dict(),
+    "trigrams": dict(ngram_range=(1, 3)),
+    "bigrams_only": dict(ngram_range=(2, 2)),
+    "english_stop_words": dict(ngram_range=(1, 2), stop_words="english"),
+    "list_stop_words": dict(stop_words=["the", "was", "is"]),
+    "ascii_accents": dict(strip_accents="ascii"),
+    "unicode_accents": dict(strip_accents="unicode", ngram_range=(1, 2)),
+    "case_sensitive": dict(lowercase=False),
+    "binary_l1": dict(binary=True, norm="l1"),
+    "sublinear_no_norm": dict(sublinear_tf=True, norm=None),
+    "no_idf": dict(use_idf=False),
+    "float32": dict(dtype=np.float32),
+    "single_char_tokens": dict(token_pattern=r"(?u)\b\w+\b"),
+    "capture_group": dict(token_pattern=r"(\w+)ing\b"),
+    "char_wb": dict(analyzer="char_wb", ngram_range=(2, 3)),
+}
+
+def compare(name: str, expected, actual) -> bool:
+    expected = expected.tocsr()
+    expected.sort_indices()
+    problems = []
+    if expected.shape != actual.shape:
+        problems.append(f"shape {actual.shape} != {expected.shape}")
+    elif not np.array_equal(expected.indptr, actual.indptr) or not np.array_equal(expected.indices, actual.indices):
+        problems.append("sparsity structure differs")
+    else:
+        difference = np.abs(expected.data - actual.data).max(initial=0.0)
+        tolerance = 1e-6 if expected.dtype == np.float32 else 1e-12
+        if difference > tolerance:
+            problems.append(f"max difference {difference:.3g}")
+        if expected.dtype != actual.dtype:
+            problems.append(f"dtype {actual.dtype} != {expected.dtype}")
+
+    print(f"{'PASS' if not problems else 'FAIL'}  {name}" + (f": {'; '.join(problems)}" if problems else ""))
+    return not problems
+
+def check_vectorizers(label: str, vectorizers: dict, texts: list) -> bool:
+    featurizer = SharedFeaturizer.from_vectorizers(vectorizers)
+    ok = True
+    for name, matrix in featurizer.transform(texts).items():
+        ok &= compare(f"{label}/{name}", vectorizers[name].transform(texts), matrix)
+
+    # Texts with the same n-grams share a row; expanded back, the rows must still match
+    matrices, rows = featurizer.transform_unique(texts)
+    for name, matrix in matrices.items():
+        ok &= compare(f"{label}/{name} (unique rows)", vectorizers[name].transform(texts), matrix[rows])
+
+    # The bundle stores the vocabulary in a memory-mapped perfect hash
+    try:
+        with tempfile.TemporaryDirectory() as bundle_dir:
+            save_model_bundle(bundle_dir, vectorizers, {})
+            bundle = load_model_bundle(bundle_dir)
+            for name, matrix in bundle.featurizer.transform(texts).items():
+                ok &= compare(f"{label}/{name} (bundle)", vectorizers[name].transform(texts), matrix)
+    except ValueError as e:
+        print(f"SKIP  {label} (bundle): {str(e)}")
+    return ok
+
+def load_saved_vectorizers(models_dir: str) -> dict:
+    slot = ModelSlot(models_dir)
+    slot._load_pickled_models(models_dir)
+    vectorizers = {"fake": slot.vectorizer, "sentiment": slot.sentiment_vectorizer}
+    return {name: vec for name, vec in vectorizers.items() if vec is not None}
+
+def run_parity_checks(models_dir: str, corpus_path: str = None) -> bool:
+    texts = list(SAMPLE_TEXTS)
+    if corpus_path:
+        with open(corpus_path, encoding="utf-8") as f:
+            texts.extend(line.rstrip("\n") for line in f)
+
+    ok = True
+    saved = load_saved_vectorizers(models_dir)
+    if saved:
+        ok &= check_vectorizers("saved", saved, texts)
+    else:
+        print(f"No saved vectorizers in {models_dir}, checking fitted variants only")
+
+    for label, params in VARIANTS.items():
+        vectorizer = TfidfVectorizer(**params).fit(TRAIN_TEXTS + texts[:200])
+        ok &= check_vectorizers(label, {label: vectorizer}, texts)
+
+    # Two vectorizers with the same analyzer share one tokenization pass
+    first = TfidfVectorizer(ngram_range=(1, 2), max_features=40).fit(TRAIN_TEXTS)
+    second = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True).fit(TRAIN_TEXTS + texts[:200])
+    ok &= check_vectorizers("shared_group", {"first": first, "second": second}, texts)
+    return ok
+
+if __name__ == "__main__":
+    # Usage: python test_featurizer_parity.py [models_dir [corpus_file]]
+    models_dir = sys.argv[1] if len(sys.argv) > 1 else settings.MODELS_DIR
+    corpus_path = sys.argv[2] if len(sys.argv) > 2 else None
+    if not os.path.isdir(models_dir):
+        print(f"Models directory {models_dir} not found")
+    if run_parity_checks(models_dir, corpus_path):
+        print("Featurizer output matches vectorizer.transform()")
+    else:
+        print("Featurizer parity check FAILED")
+        sys.exit(1)
@@ -1,8 +1,13 @@
-import requests
 import re
+import json
 import time
-from typing import List
+import asyncio
+import aiohttp
+from typing import AsyncIterator, List, Optional
 from config.settings import settings
+from utils.http_client import http_client
+from utils.metrics import metrics
+from utils.review_cache import review_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,190 +28,254 @@ def extract_asin_from_url(url: str) -> str:
     
     raise ValueError("Invalid Amazon URL. Could not extract ASIN.")
 
-def fetch_reviews_from_amazon(asin: str, max_pages: int = 3) -> List[str]:
-    """Fetch reviews from Amazon using RapidAPI - Fixed to handle actual API response format"""
-    all_reviews = []
+RAPIDAPI_REVIEWS_URL = f"{settings.RAPIDAPI_BASE_URL.rstrip('/')}/product-reviews"
+
+# Returned when the API yields no reviews at all, so the analyzer still has input
+SAMPLE_REVIEWS = [
+    "This product is amazing! Great quality and fast shipping. Highly recommend!",
+    "Not bad, but could be better. The quality is okay for the price.",
+    "Terrible product! Broke after one day. Would not recommend to anyone.",
+    "Excellent value for money. Exactly what I was looking for.",
+    "Average product. Nothing special but does the job.",
+    "The delivery was super quick but the product quality was disappointing.",
+    "I've bought this product three times now. Always consistent quality.",
+    "Overpriced for what it is. You can find better alternatives for less.",
+    "The customer service was excellent when I had issues with my order.",
+    "Beautiful design, but functionality could be improved.",
+    "Love it! Exceeded my expectations in every way.",
+    "The material feels cheap and flimsy. Not worth the money.",
+    "Works as advertised. Satisfied with my purchase.",
+    "Fantastic product! Will buy again.",
+    "Did not meet my expectations. Returning it.",
+    "Great for daily use and very durable.",
+    "Highly recommend for anyone looking for quality and reliability.",
+    "This product is amazing! Great quality and fast shipping. Highly recommend!",
+    "I LOVEEE ITTTTT.....",
+    "Just okay, nothing extraordinary.",
+    "Exceeded my expectations in every way!",
+    "Would not recommend to anyone.",
+    "Fantastic product! Will buy again.",
+    "Does the job",
+    "no just no",
+    "Scam",
+    "This is not what i wanteeddddd"
+]
+
+def _rapidapi_headers() -> dict:
+    # Using the exact header format from your RapidAPI code
+    return {
+        "x-rapidapi-key": settings.RAPIDAPI_KEY,
+        "x-rapidapi-host": settings.RAPIDAPI_HOST
+    }
+
+def extract_reviews_from_response(json_data) -> List[str]:
+    """Pull review texts out of a product-reviews API response"""
+    page_reviews = []
     
-    for page in range(1, max_pages + 1):
-        # Using the exact URL format from your RapidAPI code
-        url = "https://real-time-amazon-data.p.rapidapi.com/product-reviews"
+    # Handle the actual API response structure
+    if isinstance(json_data, dict):
+        # The actual API returns: {"ProductName": "", "ProductRating": "", "Reviewers": [], ...}
+        reviewers = json_data.get("Reviewers", [])
+        logger.info(f"Found {len(reviewers)} reviewers in response")
         
-        querystring = {
-            "asin": asin,
-            "country": "US", 
-            "page": str(page)
-        }
+        if reviewers and isinstance(reviewers, list):
+            for reviewer_data in reviewers:
+                if isinstance(reviewer_data, dict):
+                    # Extract review text from different possible fields
+                    review_text = None
+                    
+                    # Try different possible field names for review text
+                    for field in ["Review", "review", "ReviewText", "text", "comment", "ReviewContent"]:
+                        if field in reviewer_data and reviewer_data[field]:
+                            review_text = str(reviewer_data[field]).strip()
+                            break
+                    
+                    # If no review text found, try combining title and content
+                    if not review_text and "ReviewTitle" in reviewer_data and "ReviewContent" in reviewer_data:
+                        title = reviewer_data.get("ReviewTitle", "")
+                        content = reviewer_data.get("ReviewContent", "")
+                        if title or content:
+                            review_text = f"{title} {content}".strip()
+                    
+                    if review_text and len(review_text) > 10:
+                        page_reviews.append(review_text)
+                        logger.info(f"Added review: {review_text[:30]}...")
+    
+    return page_reviews
+
+async def fetch_review_page(
+    session: aiohttp.ClientSession,
+    asin: str,
+    page: int,
+    country: str = "US"
+) -> Optional[List[str]]:
+    """Fetch one page of reviews. Returns None when the page could not be fetched."""
+    querystring = {
+        "asin": asin,
+        "country": country, 
+        "page": str(page)
+    }
+    
+    started = time.perf_counter()
+    try:
+        logger.info(f"🔍 Fetching page {page} for ASIN: {asin}")
         
-        # Using the exact header format from your RapidAPI code
-        headers = {
-            "x-rapidapi-key": settings.RAPIDAPI_KEY,
-            "x-rapidapi-host": settings.RAPIDAPI_HOST
-        }
+        # Retry logic for 503 errors (service overload)
+        max_retries = max(1, settings.RAPIDAPI_MAX_RETRIES)
+        retry_delay = settings.RAPIDAPI_RETRY_DELAY_SECONDS
         
-        try:
-            logger.info(f"🔍 Fetching page {page} for ASIN: {asin}")
-            
-            # Retry logic for 503 errors (service overload)
-            max_retries = 3
-            retry_delay = 2  # seconds
-            
-            for attempt in range(max_retries):
-                response = requests.get(url, headers=headers, params=querystring, timeout=30)
-                logger.info(f"📊 API Response Status for page {page}: {response.status_code}")
+        for attempt in range(max_retries):
+            started = time.perf_counter()
+            async with session.get(RAPIDAPI_REVIEWS_URL, headers=_rapidapi_headers(), params=querystring) as response:
+                status = response.status
+                logger.info(f"📊 API Response Status for page {page}: {status}")
                 
-                if response.status_code == 503:
-                    if attempt < max_retries - 1:
-                        logger.warning(f"⏳ API service overloaded (503), retrying in {retry_delay}s... (attempt {attempt + 1}/{max_retries})")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
-                        continue
-                    else:
+                if status == 503 and attempt < max_retries - 1:
+                    metrics.observe_upstream_fetch(status, time.perf_counter() - started)
+                    metrics.count_upstream_retry()
+                    logger.warning(f"⏳ API service overloaded (503), retrying in {retry_delay}s... (attempt {attempt + 1}/{max_retries})")
+                else:
+                    if status == 503:
                         logger.error(f"❌ API still unavailable after {max_retries} attempts")
-                break
-            
-            if response.status_code == 200:
-                try:
-                    json_data = response.json()
-                    logger.info(f"📨 Response keys: {list(json_data.keys()) if isinstance(json_data, dict) else 'Not a dictionary'}")
-                    
-                    # Extract reviews from the response
-                    page_reviews = []
-                    
-                    # Handle the actual API response structure
-                    if isinstance(json_data, dict):
-                        # The actual API returns: {"ProductName": "", "ProductRating": "", "Reviewers": [], ...}
-                        reviewers = json_data.get("Reviewers", [])
-                        logger.info(f"Found {len(reviewers)} reviewers in response")
-                        
-                        if reviewers and isinstance(reviewers, list):
-                            for reviewer_data in reviewers:
-                                if isinstance(reviewer_data, dict):
-                                    # Extract review text from different possible fields
-                                    review_text = None
-                                    
-                                    # Try different possible field names for review text
-                                    for field in ["Review", "review", "ReviewText", "text", "comment", "ReviewContent"]:
-                                        if field in reviewer_data and reviewer_data[field]:
-                                            review_text = str(reviewer_data[field]).strip()
-                                            break
-                                    
-                                    # If no review text found, try combining title and content
-                                    if not review_text and "ReviewTitle" in reviewer_data and "ReviewContent" in reviewer_data:
-                                        title = reviewer_data.get("ReviewTitle", "")
-                                        content = reviewer_data.get("ReviewContent", "")
-                                        if title or content:
-                                            review_text = f"{title} {content}".strip()
-                                    
-                                    if review_text and len(review_text) > 10:
-                                        page_reviews.append(review_text)
-                                        logger.info(f"Added review: {review_text[:30]}...")
-                    
-                    all_reviews.extend(page_reviews)
-                    logger.info(f"✅ Found {len(page_reviews)} reviews on page {page}")
-                    
-                    # If no reviews found on this page, stop fetching
-                    if not page_reviews:
-                        logger.info(f"🛑 No more reviews found, stopping at page {page}")
-                        break
-                        
-                except Exception as e:
-                    logger.error(f"❌ Failed to parse JSON for page {page}: {str(e)}")
-                    logger.error(f"Raw response preview: {str(response.text)[:300]}...")
+                    body = await response.text()
+                    metrics.observe_upstream_fetch(status, time.perf_counter() - started)
                     break
-                    
-            elif response.status_code == 429:
-                logger.warning(f"⏰ Rate limit hit for page {page}")
-                break
+            
+            # Back off without holding a worker thread
+            await asyncio.sleep(retry_delay)
+            retry_delay *= 2  # Exponential backoff
+        
+        if status == 200:
+            try:
+                json_data = json.loads(body)
+                logger.info(f"📨 Response keys: {list(json_data.keys()) if isinstance(json_data, dict) else 'Not a dictionary'}")
                 
-            else:
-                logger.error(f"❌ API request failed for page {page} with status: {response.status_code}")
-                logger.error(f"Response preview: {str(response.text)[:300]}...")
-                break
+                page_reviews = extract_reviews_from_response(json_data)
+                logger.info(f"✅ Found {len(page_reviews)} reviews on page {page}")
+                return page_reviews
                 
-        except requests.RequestException as e:
-            logger.error(f"🌐 Network error for page {page}: {str(e)}")
-            break
-        except Exception as e:
-            logger.error(f"💥 Unexpected error for page {page}: {str(e)}")
-            break
+            except Exception as e:
+                logger.error(f"❌ Failed to parse JSON for page {page}: {str(e)}")
+                logger.error(f"Raw response preview: {body[:300]}...")
+                return None
+                
+        elif status == 429:
+            logger.warning(f"⏰ Rate limit hit for page {page}")
+            return None
+            
+        else:
+            logger.error(f"❌ API request failed for page {page} with status: {status}")
+            logger.error(f"Response preview: {body[:300]}...")
+            return None
+            
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        metrics.observe_upstream_fetch("error", time.perf_counter() - started)
+        logger.error(f"🌐 Network error for page {page}: {str(e)}")
+        return None
+    except Exception as e:
+        logger.error(f"💥 Unexpected error for page {page}: {str(e)}")
+        return None
+
+async def iter_review_pages(asin: str, max_pages: int = 3, country: str = "US") -> AsyncIterator[List[str]]:
+    """Yield pages of reviews in order while later pages are still downloading.
+
+    Pages are fetched in parallel up to RAPIDAPI_MAX_CONCURRENT_PAGES, so the
+    next page is usually ready by the time the caller has processed the
+    current one. The first page that comes back empty or fails ends the
+    iteration and cancels the remaining requests, matching the old
+    page-by-page behaviour. Pages found in the review cache skip the
+    upstream call.
+    """
+    semaphore = asyncio.Semaphore(settings.RAPIDAPI_MAX_CONCURRENT_PAGES)
+    session = await http_client.get_session()
     
-    logger.info(f"🎯 Total reviews fetched: {len(all_reviews)}")
+    async def fetch_upstream(page: int) -> Optional[List[str]]:
+        async with semaphore:
+            return await fetch_review_page(session, asin, page, country)
     
-    # If no reviews were fetched from API, return sample reviews for testing
-    if not all_reviews:
-        logger.warning("⚠️ No reviews found from API, using sample reviews")
-        sample_reviews = [
-            "This product is amazing! Great quality and fast shipping. Highly recommend!",
-            "Not bad, but could be better. The quality is okay for the price.",
-            "Terrible product! Broke after one day. Would not recommend to anyone.",
-            "Excellent value for money. Exactly what I was looking for.",
-            "Average product. Nothing special but does the job.",
-            "The delivery was super quick but the product quality was disappointing.",
-            "I've bought this product three times now. Always consistent quality.",
-            "Overpriced for what it is. You can find better alternatives for less.",
-            "The customer service was excellent when I had issues with my order.",
-            "Beautiful design, but functionality could be improved.",
-            "Love it! Exceeded my expectations in every way.",
-            "The material feels cheap and flimsy. Not worth the money.",
-            "Works as advertised. Satisfied with my purchase.",
-            "Fantastic product! Will buy again.",
-            "Did not meet my expectations. Returning it.",
-            "Great for daily use and very durable.",
-            "Highly recommend for anyone looking for quality and reliability.",
-            "This product is amazing! Great quality and fast shipping. Highly recommend!",
-            "I LOVEEE ITTTTT.....",
-            "Just okay, nothing extraordinary.",
-            "Exceeded my expectations in every way!",
-            "Would not recommend to anyone.",
-            "Fantastic product! Will buy again.",
-            "Does the job",
-            "no just no",
-            "Scam",
-            "This is not what i wanteeddddd"
-        ]
-        return sample_reviews
+    async def fetch_page(page: int) -> Optional[List[str]]:
+        return await review_cache.get_page(asin, country, page, lambda: fetch_upstream(page))
     
-    # Remove duplicates while preserving order
-    unique_reviews = []
+    tasks = [asyncio.create_task(fetch_page(page)) for page in range(1, max_pages + 1)]
+    try:
+        for page, task in enumerate(tasks, start=1):
+            page_reviews = await task
+            if not page_reviews:
+                # If no reviews found on this page, stop fetching
+                logger.info(f"🛑 No more reviews found, stopping at page {page}")
+                break
+            yield page_reviews
+    finally:
+        # Cancel pages past the first empty one, or left over if the caller stopped early
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+async def iter_reviews_from_amazon(asin: str, max_pages: int = 3, country: str = "US") -> AsyncIterator[List[str]]:
+    """Yield new, de-duplicated reviews page by page, capped at 50 in total"""
     seen = set()
-    for review in all_reviews:
-        if review not in seen:
-            unique_reviews.append(review)
-            seen.add(review)
+    total = 0
     
-    logger.info(f"🔄 Unique reviews after deduplication: {len(unique_reviews)}")
+    async for page_reviews in iter_review_pages(asin, max_pages, country):
+        # Remove duplicates while preserving order
+        new_reviews = []
+        for review in page_reviews:
+            if review not in seen:
+                seen.add(review)
+                new_reviews.append(review)
+        
+        # Limit to 50 reviews to avoid overwhelming the system
+        new_reviews = new_reviews[:50 - total]
+        total += len(new_reviews)
+        if new_reviews:
+            yield new_reviews
+        if total >= 50:
+            break
     
-    # Limit to 50 reviews to avoid overwhelming the system
-    final_reviews = unique_reviews[:50]
-    logger.info(f"📝 Final reviews returned: {len(final_reviews)}")
+    logger.info(f"🎯 Total unique reviews fetched: {total}")
     
+    # If no reviews were fetched from API, return sample reviews for testing
+    if total == 0:
+        logger.warning("⚠️ No reviews found from API, using sample reviews")
+        yield list(SAMPLE_REVIEWS)
+
+async def fetch_reviews_from_amazon(asin: str, max_pages: int = 3, country: str = "US") -> List[str]:
+    """Fetch reviews from Amazon using RapidAPI, requesting pages concurrently"""
+    final_reviews = []
+    async for reviews in iter_reviews_from_amazon(asin, max_pages, country):
+        final_reviews.extend(reviews)
+    
+    logger.info(f"📝 Final reviews returned: {len(final_reviews)}")
     return final_reviews
 
-def test_api_connection(asin: str = "B01H6GUCCQ") -> dict:
+async def test_api_connection(asin: str = "B01H6GUCCQ") -> dict:
     """Test API connection with a known ASIN"""
     try:
-        url = "https://real-time-amazon-data.p.rapidapi.com/product-reviews"
         querystring = {"asin": asin, "country": "US", "page": "1"}
-        headers = {
-            "x-rapidapi-key": settings.RAPIDAPI_KEY,
-            "x-rapidapi-host": settings.RAPIDAPI_HOST
-        }
         
         logger.debug(f"API Key: {settings.RAPIDAPI_KEY[:5]}...{settings.RAPIDAPI_KEY[-5:] if settings.RAPIDAPI_KEY else 'None'}")
         logger.debug(f"API Host: {settings.RAPIDAPI_HOST}")
         logger.debug(f"Testing API with ASIN: {asin}")
         
-        response = requests.get(url, headers=headers, params=querystring, timeout=15)
+        session = await http_client.get_session()
+        async with session.get(
+            RAPIDAPI_REVIEWS_URL,
+            headers=_rapidapi_headers(),
+            params=querystring,
+            timeout=aiohttp.ClientTimeout(total=15)
+        ) as response:
+            status = response.status
+            text = await response.text()
         
         result = {
-            "success": response.status_code == 200,
-            "status_code": response.status_code,
-            "response_preview": str(response.text)[:500] + "..." if len(response.text) > 500 else response.text
+            "success": status == 200,
+            "status_code": status,
+            "response_preview": text[:500] + "..." if len(text) > 500 else text
         }
         
-        if response.status_code == 200:
+        if status == 200:
             try:
-                json_data = response.json()
+                json_data = json.loads(text)
                 # Log the structure of the response
                 result["response_keys"] = list(json_data.keys()) if isinstance(json_data, dict) else "Not a dictionary"
                 if isinstance(json_data, dict) and "Reviewers" in json_data:
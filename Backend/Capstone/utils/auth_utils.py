@@ -1,9 +1,12 @@
+import hmac
+from typing import Optional
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
-from fastapi import Depends, HTTPException
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from config.settings import settings
+from database.user_db import get_user_principal
 
 # Password hasher
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto",
@@ -27,7 +30,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -41,3 +44,17 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         return username
     except JWTError:
         raise credentials_exception
+
+async def get_current_principal(username: str = Depends(get_current_user)) -> dict:
+    """The authenticated user's document (without the password), usually with no database read"""
+    user = await get_user_principal(username)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+def require_model_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard for model administration: requires the MODEL_ADMIN_TOKEN header value"""
+    if not settings.MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model administration is disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.MODEL_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
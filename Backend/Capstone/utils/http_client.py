@@ -0,0 +1,77 @@
+import logging
+from typing import Optional
+import aiohttp
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class PooledHTTPClient:
+    """Shared aiohttp session that keeps RapidAPI connections alive between requests"""
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_end(session, context, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    async def start(self) -> aiohttp.ClientSession:
+        # No awaits between the check and the assignment, so this can't race
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_SIZE,
+                limit_per_host=settings.HTTP_POOL_PER_HOST,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.RAPIDAPI_TIMEOUT_SECONDS),
+                trace_configs=[self._trace_config()]
+            )
+            logger.info(
+                f"✅ HTTP connection pool ready (size={settings.HTTP_POOL_SIZE}, "
+                f"per_host={settings.HTTP_POOL_PER_HOST})"
+            )
+        return self._session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            return await self.start()
+        return self._session
+
+    async def close(self):
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info("HTTP connection pool closed")
+
+    def stats(self) -> dict:
+        connections = self.connections_created + self.connections_reused
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "pool_size": settings.HTTP_POOL_SIZE,
+            "per_host_limit": settings.HTTP_POOL_PER_HOST,
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": round(self.connections_reused / connections, 4) if connections else 0.0
+        }
+
+# Global pooled client instance
+http_client = PooledHTTPClient()
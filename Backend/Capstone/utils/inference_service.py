@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from config.settings import settings
+from models.schemas import SingleReviewAnalysis
+from utils.metrics import metrics
+from utils.lexicon_sentiment import lexicon_sentiment
+from utils.model_loader import model_loader
+from utils.prediction import review_analyzer
+
+logger = logging.getLogger(__name__)
+
+class InferenceQueueFull(HTTPException):
+    """Raised when more scoring jobs are waiting than INFERENCE_MAX_QUEUE allows"""
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Analysis service is busy. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+
+# Module-level entry points so jobs can be pickled for a process pool
+def _init_process_worker(slot_sources: dict):
+    # Workers start from a clean forkserver or spawn process, so they load the
+    # parent's slots themselves; bundled weights are memory-mapped and shared
+    model_loader.load_slot_sources(slot_sources)
+    if not model_loader.has_model("sentiment"):
+        lexicon_sentiment.load()
+
+def _worker_pid(hold_seconds: float = 0.0) -> int:
+    time.sleep(hold_seconds)
+    return os.getpid()
+
+def _analyze_reviews(reviews: List[str], model_version: str) -> dict:
+    return review_analyzer.analyze_reviews(reviews, model_version)
+
+def _analyze_batch(reviews: List[str], model_version: str) -> List[SingleReviewAnalysis]:
+    return review_analyzer.analyze_batch(reviews, model_version)
+
+def _prepare_reviews(reviews: List[str]) -> Tuple[List[str], List[int], List[str]]:
+    reviews = review_analyzer.prepare_reviews(reviews)
+    duplicate_ids = review_analyzer.duplicate_ids(reviews)
+    return reviews, duplicate_ids, review_analyzer.unique_reviews(reviews, duplicate_ids)
+
+class InferenceService:
+    """Runs CPU-bound review scoring on a bounded thread or process pool, off the event loop"""
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        # Serializes pool builds, which can take seconds, without holding _lock
+        self._pool_lock = threading.Lock()
+        self.mode = settings.INFERENCE_EXECUTOR
+        self.max_workers = settings.INFERENCE_WORKERS
+        self.max_queue = settings.INFERENCE_MAX_QUEUE
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.warmup_waits = 0
+        self.worker_pids = []
+        metrics.register_gauge(
+            "revai_inference_in_flight", "Scoring jobs running or waiting for a worker", lambda: self.in_flight
+        )
+        metrics.register_gauge(
+            "revai_inference_queue_limit", "INFERENCE_MAX_QUEUE; jobs beyond it are rejected", lambda: self.max_queue
+        )
+
+    def start(self) -> Executor:
+        with self._pool_lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    executor = self._start_process_pool()
+                else:
+                    executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="inference"
+                    )
+                with self._lock:
+                    self._executor = executor
+                logger.info(f"✅ Inference {self.mode} pool started with {self.max_workers} workers")
+            return self._executor
+
+    def _start_process_pool(self) -> ProcessPoolExecutor:
+        """Start every worker and wait for it to load models; blocks, so call it off the event loop"""
+        if not model_loader.is_warm():
+            model_loader.load_models()
+        self._warn_unshared_models()
+
+        # The API process already runs Motor, aiohttp and thread pool threads, and
+        # a plain fork could copy locks they hold; forkserver children start clean
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["utils.prediction"])
+        else:
+            context = multiprocessing.get_context("spawn")
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_process_worker,
+            initargs=(model_loader.slot_sources(),)
+        )
+
+        # Start every worker now, before requests reach it. Each probe holds
+        # its worker briefly, otherwise the pool reuses one idle process for all
+        futures = [executor.submit(_worker_pid, 0.2) for _ in range(self.max_workers)]
+        self.worker_pids = sorted({future.result() for future in futures})
+        return executor
+
+    def _warn_unshared_models(self):
+        """Bundled weights are shared by every worker, pickled ones are copied into each"""
+        for label, slot in (("active", model_loader.active), ("candidate", model_loader.candidate)):
+            pickled = slot.pickled_models() if slot is not None else []
+            if pickled:
+                logger.warning(
+                    f"⚠️ The {label} models ({slot.model_version}) have no model bundle: each of the "
+                    f"{self.max_workers} inference workers unpickles its own {' and '.join(pickled)} model{'s' if len(pickled) > 1 else ''}, "
+                    f"so memory grows with INFERENCE_WORKERS. Run convert_models.py to build {slot.bundle_dir}"
+                )
+
+    def recycle(self):
+        """Replace process workers so they load the current model slots; blocks, so call it off the event loop.
+
+        The old pool keeps serving until the new one is ready, and jobs
+        already submitted to it still finish there.
+        """
+        if self.mode != "process":
+            return
+        with self._pool_lock:
+            if self._executor is None:
+                return
+            new_executor = self._start_process_pool()
+            with self._lock:
+                old_executor = self._executor
+                if old_executor is not None:
+                    self._executor = new_executor
+        if old_executor is None:
+            # The service was shut down while the new pool was starting
+            new_executor.shutdown(wait=False)
+            return
+        old_executor.shutdown(wait=False)
+        logger.info(f"♻️ Inference process pool recycled ({len(self.worker_pids)} workers)")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+            logger.info("Inference pool shut down")
+
+    def _admit(self):
+        if self.in_flight >= self.max_queue:
+            self.rejected += 1
+            metrics.count_rejected()
+            logger.warning(f"⚠️ Inference queue full ({self.in_flight} jobs), rejecting request")
+            raise InferenceQueueFull()
+
+    async def _wait_for_models(self):
+        """Hold a request while models load in the background, within the queue limit"""
+        if not model_loader.is_loading():
+            return
+        self._admit()
+        self.in_flight += 1
+        self.warmup_waits += 1
+        try:
+            await model_loader.wait_until_loaded(settings.MODEL_WARMUP_WAIT_SECONDS)
+        finally:
+            self.in_flight -= 1
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Submit fn(*args) to the pool and await its result"""
+        self._admit()
+        self.in_flight += 1
+        try:
+            executor = self._executor
+            if executor is None and not (self.mode == "process" and model_loader.is_loading()):
+                executor = await run_in_threadpool(self.start)
+            # A process pool is only started once models are in memory; until then
+            # fallback scoring runs on the loop's default thread pool
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, partial(fn, *args))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def analyze_reviews(self, reviews: List[str]) -> dict:
+        await self._wait_for_models()
+        slot = model_loader.select_slot()
+        started = time.perf_counter()
+
+        if self.mode != "process":
+            result = await self.run(_analyze_reviews, reviews, slot.model_version)
+        else:
+            # Score each distinct review once, spread across workers; the steps
+            # before and after are CPU work on the whole request, so they run
+            # on the thread pool rather than the loop
+            reviews, duplicate_ids, unique_reviews = await run_in_threadpool(_prepare_reviews, reviews)
+            chunk_results = await asyncio.gather(
+                *(self.run(_analyze_batch, chunk, slot.model_version) for chunk in self._split(unique_reviews))
+            )
+            unique_analyses = [analysis for chunk_result in chunk_results for analysis in chunk_result]
+            result = await run_in_threadpool(review_analyzer.assemble_results, reviews, duplicate_ids, unique_analyses)
+
+        slot.record(result["detailed_results"], time.perf_counter() - started)
+        return result
+
+    def _split(self, reviews: List[str]) -> List[List[str]]:
+        chunk_size = max(settings.INFERENCE_MIN_CHUNK_SIZE, math.ceil(len(reviews) / self.max_workers))
+        return [reviews[start:start + chunk_size] for start in range(0, len(reviews), chunk_size)]
+
+    async def analyze_batch(self, reviews: List[str]) -> List[SingleReviewAnalysis]:
+        await self._wait_for_models()
+        slot = model_loader.select_slot()
+        started = time.perf_counter()
+        analyses = await self.run(_analyze_batch, reviews, slot.model_version)
+        slot.record(analyses, time.perf_counter() - started)
+        return analyses
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "running": self._executor is not None,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "warmup_waits": self.warmup_waits,
+            "worker_pids": self.worker_pids
+        }
+
+# Global inference service instance
+inference_service = InferenceService()
@@ -0,0 +1,120 @@
+import json
+import logging
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keywords and text are split the same way, so matches always end on word boundaries
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+class KeywordMatcher:
+    """Counts keyword hits for several keyword sets in one pass over a text.
+
+    An Aho-Corasick automaton is built over word tokens rather than
+    characters: "box" matches "box" and "gift box" but not "xbox", and
+    multi-word keywords like "best ever" match across any run of
+    non-word characters. Scanning costs one dict lookup per token of the
+    text, however many keywords there are.
+
+    count() returns, per set, how many distinct keywords of that set occur
+    in the text. A keyword listed in several sets counts for each of them.
+    """
+    def __init__(self, keyword_sets: Dict[str, Iterable[str]]):
+        self.set_names = list(keyword_sets)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Keyword ids that end at each state, including those reached through fail links
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._keyword_sets: List[Tuple[str, ...]] = []
+
+        keyword_ids: Dict[Tuple[str, ...], int] = {}
+        for set_name, keywords in keyword_sets.items():
+            for keyword in keywords:
+                tokens = tuple(tokenize(keyword))
+                if not tokens:
+                    continue
+                if tokens not in keyword_ids:
+                    keyword_ids[tokens] = len(self._keyword_sets)
+                    self._keyword_sets.append(())
+                    self._add(tokens, keyword_ids[tokens])
+                keyword_id = keyword_ids[tokens]
+                if set_name not in self._keyword_sets[keyword_id]:
+                    self._keyword_sets[keyword_id] += (set_name,)
+
+        self._build_fail_links()
+        logger.debug(f"Keyword matcher built: {len(self._keyword_sets)} keywords in {len(self.set_names)} sets")
+
+    def _add(self, tokens: Tuple[str, ...], keyword_id: int):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        self._outputs[state] += (keyword_id,)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+
+    def matches(self, text: str) -> set:
+        """Ids of the distinct keywords found in text"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = set()
+        state = 0
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords from each set that occur in text"""
+        counts = {name: 0 for name in self.set_names}
+        for keyword_id in self.matches(text):
+            for set_name in self._keyword_sets[keyword_id]:
+                counts[set_name] += 1
+        return counts
+
+def load_keyword_sets(defaults: Dict[str, List[str]], path: Optional[str]) -> Dict[str, List[str]]:
+    """Overlay keyword lists from a JSON file ({"fake": [...], "quality": [...]}) on the defaults.
+
+    Sets present in the file replace the built-in list; the rest keep their
+    defaults. A missing or invalid file is logged and the defaults are used.
+    """
+    keyword_sets = {name: list(keywords) for name, keywords in defaults.items()}
+    if not path:
+        return keyword_sets
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            configured = json.load(f)
+        for name, keywords in configured.items():
+            if name not in keyword_sets:
+                logger.warning(f"⚠️ Ignoring unknown keyword set '{name}' in {path}")
+                continue
+            keyword_sets[name] = [str(keyword) for keyword in keywords]
+        logger.info(f"✅ Keyword lists loaded from {path}")
+    except Exception as e:
+        logger.error(f"❌ Failed to load keyword lists from {path}, using defaults: {str(e)}")
+    return keyword_sets
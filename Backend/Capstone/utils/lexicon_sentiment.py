@@ -0,0 +1,266 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from textblob._text import (
+    ABBREVIATIONS,
+    EMOTICONS,
+    PUNCTUATION,
+    RE_ABBR1,
+    RE_ABBR2,
+    RE_ABBR3,
+    RE_EMOTICONS,
+    RE_SARCASM,
+)
+
+logger = logging.getLogger(__name__)
+
+NEGATIONS = ("no", "not", "n't", "never")
+QUOTES = ("“", "”", "‘", "’", "'", '"')
+# Periods are split separately, since they may end an abbreviation
+LEADING_PUNCTUATION = frozenset(PUNCTUATION.replace(".", ""))
+TRAILING_PUNCTUATION = LEADING_PUNCTUATION | {"."}
+
+# Token flags
+KNOWN = 1 << 0            # in the lexicon
+MODIFIER = 1 << 1         # has an adverb reading, so it scales the next known word ("very")
+LY_ADVERB = 1 << 2        # ends in -ly, so it also takes a following negation ("really not")
+NEGATION = 1 << 3
+EXCLAMATION = 1 << 4      # "!" boosts the previous assessment
+SARCASM = 1 << 5          # "(!)"
+EMOTICON = 1 << 6
+ENDS_MODIFIER = 1 << 7    # unknown words longer than 2 characters
+ENDS_NEGATION = 1 << 8    # unknown words longer than 1 character, quotes aside
+
+def _split_punctuation(token: str, tokens: List[str]):
+    while token and token[0] in LEADING_PUNCTUATION:
+        tokens.append(token[0])
+        token = token[1:]
+
+    tail = []
+    while token and token[-1] in TRAILING_PUNCTUATION:
+        if token[-1] in LEADING_PUNCTUATION:
+            tail.append(token[-1])
+            token = token[:-1]
+        if token.endswith("..."):
+            tail.append("...")
+            token = token[:-3].rstrip(".")
+        if token.endswith("."):
+            if (
+                token in ABBREVIATIONS
+                or RE_ABBR1.match(token)
+                or RE_ABBR2.match(token)
+                or RE_ABBR3.match(token)
+            ):
+                break
+            tail.append(".")
+            token = token[:-1]
+
+    if token:
+        tokens.append(token)
+    tokens.extend(reversed(tail))
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased tokens, split the way TextBlob's sentiment analyzer splits them.
+
+    Contractions lose their "n't" to a separate token, quotes and leading
+    and trailing punctuation are split off (periods only when they don't end
+    an abbreviation), then "(!)" and emoticons broken up by the punctuation
+    split are joined back together.
+    """
+    text = str(text).replace("n't", " n't")
+    for quote in QUOTES:
+        if quote in text:
+            text = text.replace(quote, f" {quote} ")
+
+    tokens = []
+    for token in text.split():
+        if token[0] in LEADING_PUNCTUATION or token[-1] in TRAILING_PUNCTUATION:
+            _split_punctuation(token, tokens)
+        else:
+            tokens.append(token)
+
+    joined = " ".join(tokens)
+    if "!" in joined:
+        joined = RE_SARCASM.sub("(!)", joined)
+    joined = RE_EMOTICONS.sub(lambda match: match.group(1).replace(" ", "") + match.group(2), joined)
+    return joined.lower().split()
+
+class LexiconSentiment:
+    """Batch polarity scorer with TextBlob's lexicon and rules.
+
+    The pattern lexicon behind TextBlob(review).sentiment is compiled once
+    into flat arrays (polarity, intensity, flags) indexed by token id, with
+    extra ids for negations, "!", "(!)" and emoticons. A batch is tokenized,
+    mapped to ids, and all lookups are gathered with one numpy index per
+    array. A single pass over the batch's ids then applies the rules:
+    modifiers multiply the next known word ("very good"), negations flip
+    and halve it ("not good"), both carry over short words ("not a good"),
+    "!" boosts the previous word, and emoticons count as words. Per-review
+    polarity is the mean of its assessments, as in TextBlob.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token_ids: Optional[Dict[str, int]] = None
+        self.polarity: Optional[np.ndarray] = None
+        self.intensity: Optional[np.ndarray] = None
+        self.flags: Optional[np.ndarray] = None
+        # Ids for tokens outside the lexicon, by ENDS_MODIFIER | ENDS_NEGATION
+        self._unknown_ids: Dict[int, int] = {}
+
+    def is_loaded(self) -> bool:
+        return self._token_ids is not None
+
+    def load(self):
+        """Compile the lexicon; safe to call repeatedly"""
+        with self._lock:
+            if self._token_ids is None:
+                self._compile()
+
+    def _compile(self):
+        from textblob.en import sentiment as lexicon
+        if not dict.__len__(lexicon):
+            lexicon.load()
+
+        token_ids: Dict[str, int] = {}
+        polarity: List[float] = []
+        intensity: List[float] = []
+        flags: List[int] = []
+
+        def add(token: str, token_polarity: float, token_intensity: float, token_flags: int):
+            token_ids[token] = len(polarity)
+            polarity.append(token_polarity)
+            intensity.append(token_intensity)
+            flags.append(token_flags)
+
+        # The analyzer looks words up without a part of speech, i.e. by the
+        # averaged None entry; any adverb (RB) reading makes a word a modifier
+        for word, readings in dict.items(lexicon):
+            if None not in readings or " " in word:
+                continue
+            word_polarity, _, word_intensity = readings[None]
+            word_flags = KNOWN
+            if "RB" in readings:
+                word_flags |= MODIFIER
+            if word.endswith("ly"):
+                word_flags |= LY_ADVERB
+            if word in NEGATIONS:
+                word_flags |= NEGATION
+            add(word, float(word_polarity), float(word_intensity), word_flags)
+
+        def unknown_flags(token: str) -> int:
+            token_flags = 0
+            if len(token) > 2:
+                token_flags |= ENDS_MODIFIER
+            if len(token.strip("'")) > 1:
+                token_flags |= ENDS_NEGATION
+            return token_flags
+
+        for word in NEGATIONS:
+            if word not in token_ids:
+                add(word, 0.0, 1.0, NEGATION | unknown_flags(word))
+        add("!", 0.0, 1.0, EXCLAMATION | unknown_flags("!"))
+        add("(!)", 0.0, 1.0, SARCASM | unknown_flags("(!)"))
+        for (_, emoticon_polarity), emoticons in EMOTICONS.items():
+            for emoticon in emoticons:
+                emoticon = emoticon.lower()
+                # Only short, non-alphabetic tokens are checked for emoticons
+                if emoticon in token_ids or emoticon.isalpha() or len(emoticon) > 5 or emoticon in PUNCTUATION:
+                    continue
+                add(emoticon, emoticon_polarity, 1.0, EMOTICON | unknown_flags(emoticon))
+        for token_flags in (0, ENDS_MODIFIER, ENDS_NEGATION, ENDS_MODIFIER | ENDS_NEGATION):
+            self._unknown_ids[token_flags] = len(polarity)
+            polarity.append(0.0)
+            intensity.append(1.0)
+            flags.append(token_flags)
+
+        self.polarity = np.asarray(polarity, dtype=np.float64)
+        self.intensity = np.asarray(intensity, dtype=np.float64)
+        self.flags = np.asarray(flags, dtype=np.uint16)
+        self._token_ids = token_ids
+        logger.info(f"✅ Sentiment lexicon compiled: {len(token_ids)} tokens")
+
+    def token_ids(self, text: str) -> List[int]:
+        self.load()
+        ids = []
+        for token in tokenize(text):
+            token_id = self._token_ids.get(token)
+            if token_id is None:
+                token_flags = (ENDS_MODIFIER if len(token) > 2 else 0) | (ENDS_NEGATION if len(token.strip("'")) > 1 else 0)
+                token_id = self._unknown_ids[token_flags]
+            ids.append(token_id)
+        return ids
+
+    def polarities(self, texts: Sequence[str]) -> np.ndarray:
+        """Polarity in [-1, 1] of every text, as TextBlob(text).sentiment.polarity"""
+        self.load()
+        ids: List[int] = []
+        lengths: List[int] = []
+        for text in texts:
+            text_ids = self.token_ids(text)
+            ids.extend(text_ids)
+            lengths.append(len(text_ids))
+
+        token_ids = np.asarray(ids, dtype=np.int64)
+        flags = self.flags[token_ids].tolist()
+        polarity = self.polarity[token_ids].tolist()
+        intensity = self.intensity[token_ids].tolist()
+
+        # Assessments of the whole batch: owning text, polarity, intensity, negated
+        owners: List[int] = []
+        scores: List[float] = []
+        intensities: List[float] = []
+        negated: List[bool] = []
+
+        position = 0
+        for text_index, length in enumerate(lengths):
+            first = len(scores)
+            modifier = None  # None, or whether the pending modifier is an -ly adverb
+            negation = False
+            for k in range(position, position + length):
+                token_flags = flags[k]
+                if token_flags & KNOWN:
+                    if modifier is None:
+                        owners.append(text_index)
+                        scores.append(polarity[k])
+                        intensities.append(intensity[k])
+                        negated.append(False)
+                    else:
+                        scores[-1] = max(-1.0, min(polarity[k] * intensities[-1], 1.0))
+                        intensities[-1] = intensity[k]
+                    if negation:
+                        intensities[-1] = 1.0 / intensities[-1]
+                        negated[-1] = True
+                    modifier = bool(token_flags & LY_ADVERB) if token_flags & MODIFIER else None
+                    negation = bool(token_flags & NEGATION)
+                    continue
+
+                if token_flags & NEGATION:
+                    negation = True
+                elif negation and token_flags & ENDS_NEGATION:
+                    negation = False
+                if negation and modifier:
+                    # "really not good": the negation attaches to the modifier
+                    negated[-1] = True
+                    negation = False
+                elif modifier is not None and token_flags & ENDS_MODIFIER:
+                    modifier = None
+                if token_flags & EXCLAMATION and len(scores) > first:
+                    scores[-1] = max(-1.0, min(scores[-1] * 1.25, 1.0))
+                if token_flags & (SARCASM | EMOTICON):
+                    owners.append(text_index)
+                    scores.append(polarity[k])
+                    intensities.append(1.0)
+                    negated.append(False)
+            position += length
+
+        # "not good" is slightly bad, "not bad" slightly good
+        values = np.asarray(scores, dtype=np.float64)
+        values[np.asarray(negated, dtype=bool)] *= -0.5
+        owners_array = np.asarray(owners, dtype=np.int64)
+        totals = np.bincount(owners_array, weights=values, minlength=len(lengths))
+        counts = np.bincount(owners_array, minlength=len(lengths))
+        return totals / np.maximum(counts, 1)
+
+# Global lexicon sentiment instance
+lexicon_sentiment = LexiconSentiment()
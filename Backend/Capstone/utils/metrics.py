@@ -0,0 +1,174 @@
+import logging
+import os
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Tuple
+from config.settings import settings
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+HTTP_REQUESTS = Counter(
+    "revai_http_requests_total", "HTTP requests by route template and status",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "revai_http_request_duration_seconds", "Time to send the full HTTP response",
+    ["method", "route"]
+)
+MODEL_STAGE_LATENCY = Histogram(
+    "revai_model_stage_seconds", "Time per scoring stage (vectorize, predict, confidence) for one batch",
+    ["model", "stage"], buckets=STAGE_BUCKETS
+)
+UPSTREAM_FETCH_LATENCY = Histogram(
+    "revai_upstream_fetch_seconds", "RapidAPI review page requests, one observation per attempt",
+    ["status"], buckets=UPSTREAM_BUCKETS
+)
+UPSTREAM_RETRIES = Counter(
+    "revai_upstream_retries_total", "RapidAPI page requests retried after a 503"
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "revai_mongo_command_seconds", "MongoDB command round trips",
+    ["command", "collection", "outcome"], buckets=MONGO_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    "revai_cache_lookups_total", "Prediction and review page cache lookups by result",
+    ["cache", "result"]
+)
+INFERENCE_REJECTED = Counter(
+    "revai_inference_rejected_total", "Scoring jobs rejected because the inference queue was full"
+)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records the latency of every command a MongoClient sends"""
+    def __init__(self):
+        # Succeeded/failed events don't carry the collection, so remember it by request id
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if isinstance(collection, str):
+            self._collections[event.request_id] = collection
+
+    def _observe(self, event, outcome: str):
+        collection = self._collections.pop(event.request_id, "")
+        if metrics.enabled:
+            metrics._child(MONGO_COMMAND_LATENCY, event.command_name, collection, outcome).observe(
+                event.duration_micros / 1e6
+            )
+
+    def succeeded(self, event):
+        self._observe(event, "succeeded")
+
+    def failed(self, event):
+        self._observe(event, "failed")
+
+class ServiceMetrics:
+    """Prometheus metrics for the API, shared by every module that records them"""
+    content_type = CONTENT_TYPE_LATEST
+
+    def __init__(self):
+        self.enabled = settings.METRICS_ENABLED
+        self.http_in_progress = 0
+        # labels() takes a lock and builds a key, so each child is looked up once
+        self._children: Dict[tuple, Any] = {}
+        self._gauges: List[Tuple[str, str, Callable[[], float]]] = []
+
+    def _child(self, metric, *labels: str):
+        key = (metric, labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = metric.labels(*labels)
+        return child
+
+    def stage(self, model: str, stage: str):
+        """Context manager timing one scoring stage of a batch"""
+        if not self.enabled:
+            return nullcontext()
+        return self._child(MODEL_STAGE_LATENCY, model, stage).time()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        self._child(HTTP_REQUESTS, method, route, str(status)).inc()
+        self._child(HTTP_LATENCY, method, route).observe(seconds)
+
+    def observe_upstream_fetch(self, status, seconds: float):
+        if self.enabled:
+            self._child(UPSTREAM_FETCH_LATENCY, str(status)).observe(seconds)
+
+    def count_upstream_retry(self):
+        if self.enabled:
+            UPSTREAM_RETRIES.inc()
+
+    def count_cache_lookups(self, cache: str, result: str, count: int = 1):
+        if self.enabled and count:
+            self._child(CACHE_LOOKUPS, cache, result).inc(count)
+
+    def count_rejected(self):
+        if self.enabled:
+            INFERENCE_REJECTED.inc()
+
+    def register_gauge(self, name: str, documentation: str, read: Callable[[], float]):
+        """Expose read() as a gauge, evaluated at scrape time in this process"""
+        self._gauges.append((name, documentation, read))
+
+    def mongo_listeners(self) -> List[monitoring.CommandListener]:
+        return [MongoCommandMetrics()] if self.enabled else []
+
+    def collect(self):
+        yield GaugeMetricFamily(
+            "revai_http_requests_in_progress", "HTTP requests being handled", value=self.http_in_progress
+        )
+        for name, documentation, read in self._gauges:
+            try:
+                yield GaugeMetricFamily(name, documentation, value=read())
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read metric {name}: {str(e)}")
+
+    def render(self) -> bytes:
+        """Current metrics in the Prometheus text format"""
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            registry.register(self)
+        else:
+            registry = REGISTRY
+        return generate_latest(registry)
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request, streamed bodies included, by its route template"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.http_in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.http_in_progress -= 1
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            metrics.observe_request(scope["method"], route_path, status, time.perf_counter() - started)
+
+# Global metrics instance
+metrics = ServiceMetrics()
+REGISTRY.register(metrics)
@@ -0,0 +1,355 @@
+import hashlib
+import json
+import logging
+import os
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.text_features import SharedFeaturizer, TfidfWeighting, analyzer_params, compile_analyzer
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+# Stored in the manifest; lookups only work with the hash the bundle was built with
+VOCABULARY_HASH = "crc32-adler32-chd"
+
+# Average number of terms per perfect-hash bucket
+BUCKET_SIZE = 4
+# Displacements tried per vectorized probe while building
+PROBE_CHUNK = 256
+
+def _term_hashes(data: bytes) -> Tuple[int, int, int]:
+    """Bucket, base and step hashes of a UTF-8 term"""
+    crc = zlib.crc32(data)
+    adler = zlib.adler32(data)
+    mixed = (((adler << 32) | crc) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    return mixed >> 32, crc, adler
+
+def build_perfect_hash(terms: Sequence[str]) -> Tuple[np.ndarray, List[int]]:
+    """Place every term in its own slot with a minimal perfect hash.
+
+    Terms are hashed into buckets, and each bucket (largest first) gets a
+    displacement d = d0 * size + d1 that moves all its terms into free
+    slots, where slot = (base + d0 * step + d1) % size. Returns the
+    per-bucket displacements and the slot of every term.
+
+    Two terms with the same base and step can never share a bucket; if a
+    bucket can't be placed, the build is retried with twice as many
+    (smaller) buckets.
+    """
+    size = len(terms)
+    hashes = np.array([_term_hashes(term.encode("utf-8")) for term in terms], dtype=np.int64).reshape(-1, 3)
+    bucket_count = max(1, size // BUCKET_SIZE)
+    while True:
+        placed = _place_buckets(hashes, bucket_count)
+        if placed is not None:
+            return placed
+        if bucket_count > 4 * size:
+            raise ValueError("Could not build a perfect hash for the vocabulary")
+        bucket_count *= 2
+
+def _place_buckets(hashes: np.ndarray, bucket_count: int) -> Optional[Tuple[np.ndarray, List[int]]]:
+    size = len(hashes)
+    bucket_ids = hashes[:, 0] % bucket_count
+    bases = hashes[:, 1] % max(size, 1)
+    steps = hashes[:, 2] % max(size, 1)
+
+    bucket_sizes = np.bincount(bucket_ids, minlength=bucket_count)
+    members_by_bucket = np.split(np.argsort(bucket_ids, kind="stable"), np.cumsum(bucket_sizes)[:-1])
+    displacements = np.zeros(bucket_count, dtype=np.int64)
+    slots = np.full(size, -1, dtype=np.int64)
+    taken = np.zeros(size, dtype=bool)
+    free_slots = None
+
+    for bucket in np.argsort(-bucket_sizes, kind="stable"):
+        members = members_by_bucket[bucket]
+        if len(members) == 0:
+            break
+
+        if len(members) == 1:
+            # Single terms can go straight into any free slot
+            if free_slots is None:
+                free_slots = np.flatnonzero(~taken).tolist()
+            slot = free_slots.pop()
+            displacements[bucket] = (slot - bases[members[0]]) % size
+            slots[members[0]] = slot
+            taken[slot] = True
+            continue
+
+        for d0 in range(size):
+            offsets = (bases[members] + d0 * steps[members]) % size
+            if len(np.unique(offsets)) < len(members):
+                continue
+            d1 = _first_free_shift(offsets, taken, size)
+            if d1 is not None:
+                break
+        else:
+            return None
+
+        placed = (offsets + d1) % size
+        slots[members] = placed
+        taken[placed] = True
+        displacements[bucket] = d0 * size + d1
+
+    return displacements, slots.tolist()
+
+def _first_free_shift(offsets: np.ndarray, taken: np.ndarray, size: int) -> Optional[int]:
+    """Smallest d1 for which every (offset + d1) % size is a free slot"""
+    for start in range(0, size, PROBE_CHUNK):
+        shifts = np.arange(start, min(start + PROBE_CHUNK, size))
+        blocked = taken[(offsets[:, None] + shifts[None, :]) % size].any(axis=0)
+        if not blocked.all():
+            return int(shifts[np.argmin(blocked)])
+    return None
+
+class PerfectHashVocabulary:
+    """Read-only term lookup over memory-mapped arrays.
+
+    Behaves like the merged vocabulary dict of SharedFeaturizer: get(term)
+    returns the term's column in every vectorizer of its group, or None.
+    Terms are stored as one UTF-8 blob in slot order, so a lookup hashes the
+    term, finds its slot and compares the stored bytes to rule out unknown
+    terms. Nothing is unpickled and the arrays stay in the page cache, where
+    every worker process shares them. Recent lookups are kept in a small
+    in-process dict so hot n-grams skip the hashing.
+    """
+    def __init__(
+        self,
+        strings: np.ndarray,
+        offsets: np.ndarray,
+        displacements: np.ndarray,
+        columns: np.ndarray,
+        cache_size: int = 0
+    ):
+        self._arrays = (strings, offsets, displacements, columns)
+        self._strings = memoryview(strings)
+        self._offsets = memoryview(offsets)
+        self._displacements = memoryview(displacements)
+        self._columns = memoryview(columns.reshape(-1))
+        self._size = len(offsets) - 1
+        self._bucket_count = len(displacements)
+        self._width = columns.shape[1]
+        self._cache: Dict[str, Optional[Tuple[int, ...]]] = {}
+        self._cache_size = cache_size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _find(self, term: str) -> Optional[Tuple[int, ...]]:
+        if self._size == 0:
+            return None
+        data = term.encode("utf-8")
+        bucket_hash, base, step = _term_hashes(data)
+        d0, d1 = divmod(self._displacements[bucket_hash % self._bucket_count], self._size)
+        slot = (base + d0 * step + d1) % self._size
+
+        start, end = self._offsets[slot], self._offsets[slot + 1]
+        if self._strings[start:end] != data:
+            return None
+        return tuple(self._columns[slot * self._width:(slot + 1) * self._width])
+
+    def get(self, term: str, default: Any = None) -> Any:
+        try:
+            columns = self._cache[term]
+        except KeyError:
+            columns = self._find(term)
+            if len(self._cache) < self._cache_size:
+                self._cache[term] = columns
+        return default if columns is None else columns
+
+def _save_array(directory: str, filename: str, array: np.ndarray) -> str:
+    np.save(os.path.join(directory, filename), np.ascontiguousarray(array), allow_pickle=False)
+    return filename
+
+def _load_array(directory: str, filename: str) -> np.ndarray:
+    return np.load(os.path.join(directory, filename), mmap_mode="r", allow_pickle=False)
+
+def _json_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Make analyzer settings JSON-safe; custom callables can't be compiled"""
+    safe = {}
+    for name, value in params.items():
+        if callable(value):
+            raise ValueError(f"Vectorizer setting '{name}' is a custom callable and can't be bundled")
+        if isinstance(value, (tuple, set, frozenset)):
+            value = sorted(value) if isinstance(value, (set, frozenset)) else list(value)
+        safe[name] = value
+    return safe
+
+def _save_vocabulary(directory: str, prefix: str, merged: Dict[str, Tuple[int, ...]], width: int) -> Dict[str, Any]:
+    terms = list(merged)
+    displacements, slots = build_perfect_hash(terms)
+
+    ordered: List[Optional[str]] = [None] * len(terms)
+    for term, slot in zip(terms, slots):
+        ordered[slot] = term
+
+    encoded = [term.encode("utf-8") for term in ordered]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(data) for data in encoded])
+    strings = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    columns = np.asarray([merged[term] for term in ordered], dtype=np.int32).reshape(len(ordered), width)
+
+    return {
+        "terms": len(terms),
+        "strings": _save_array(directory, f"{prefix}.strings.npy", strings),
+        "offsets": _save_array(directory, f"{prefix}.offsets.npy", offsets),
+        "displacements": _save_array(directory, f"{prefix}.displacements.npy", displacements),
+        "columns": _save_array(directory, f"{prefix}.columns.npy", columns),
+    }
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def describe_sources(paths: Sequence[str]) -> Dict[str, dict]:
+    """Size, mtime and SHA-256 of each existing source file, keyed by file name"""
+    sources = {}
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            sources[os.path.basename(path)] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": file_digest(path)
+            }
+    return sources
+
+def changed_sources(recorded: Optional[Dict[str, dict]], paths: Sequence[str]) -> List[str]:
+    """Names of the existing files in paths that differ from the sources a bundle recorded.
+
+    Files that are gone don't count, so a bundle deployed without its pickles
+    stays usable. Contents are only hashed when size or mtime changed.
+    """
+    changed = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        name = os.path.basename(path)
+        entry = (recorded or {}).get(name)
+        if entry is None:
+            changed.append(name)
+            continue
+        stat = os.stat(path)
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            continue
+        if stat.st_size != entry["size"] or file_digest(path) != entry["sha256"]:
+            changed.append(name)
+    return changed
+
+def save_model_bundle(
+    directory: str,
+    vectorizers: Dict[str, Any],
+    models: Dict[str, Any],
+    sources: Optional[Dict[str, dict]] = None
+) -> str:
+    """Compile fitted vectorizers and linear models into a bundle directory.
+
+    vectorizers and models are keyed by name ("fake", "sentiment"). Models
+    must be linear (coef_, intercept_, classes_). sources (from
+    describe_sources) records the files they were read from, so loaders can
+    tell when the bundle is out of date. Returns the manifest path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    vectorizers = {name: vec for name, vec in vectorizers.items() if vec is not None}
+    featurizer = SharedFeaturizer.from_vectorizers(vectorizers)
+    manifest = {"format": BUNDLE_FORMAT, "hash": VOCABULARY_HASH, "vectorizers": {}, "groups": [], "models": {}}
+    if sources is not None:
+        manifest["sources"] = sources
+
+    for name, weighting in featurizer.weightings.items():
+        entry = {
+            "n_features": weighting.n_features,
+            "binary": weighting.binary,
+            "sublinear_tf": weighting.sublinear_tf,
+            "norm": weighting.norm,
+            "dtype": weighting.dtype.name,
+            "idf": None
+        }
+        if weighting.idf is not None:
+            entry["idf"] = _save_array(directory, f"{name}.idf.npy", np.asarray(weighting.idf, dtype=np.float64))
+        manifest["vectorizers"][name] = entry
+
+    for index, (names, _, merged) in enumerate(featurizer.groups):
+        manifest["groups"].append({
+            "names": names,
+            "analyzer": _json_params(analyzer_params(vectorizers[names[0]])),
+            "vocabulary": _save_vocabulary(directory, f"group{index}", merged, len(names))
+        })
+
+    for name, model in models.items():
+        if model is None:
+            continue
+        coef = model.coef_.toarray() if hasattr(model.coef_, "toarray") else model.coef_
+        classes = np.asarray(model.classes_)
+        if classes.dtype == object:
+            classes = classes.astype(str)
+        manifest["models"][name] = {
+            "coef": _save_array(directory, f"{name}.coef.npy", np.asarray(coef, dtype=np.float64)),
+            "intercept": _save_array(directory, f"{name}.intercept.npy", np.asarray(model.intercept_, dtype=np.float64).ravel()),
+            "classes": _save_array(directory, f"{name}.classes.npy", classes)
+        }
+
+    # Written last, so a half-written bundle is never picked up
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest_path
+
+class ModelBundle:
+    """A loaded bundle: a featurizer and the raw weights of each linear model"""
+    def __init__(
+        self,
+        featurizer: SharedFeaturizer,
+        models: Dict[str, Dict[str, np.ndarray]],
+        manifest_path: str,
+        sources: Optional[Dict[str, dict]] = None
+    ):
+        self.featurizer = featurizer
+        self.models = models
+        self.manifest_path = manifest_path
+        # None for bundles built before source files were recorded
+        self.sources = sources
+
+def load_model_bundle(directory: str, lookup_cache_size: int = 0) -> ModelBundle:
+    """Memory-map a bundle written by save_model_bundle"""
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported model bundle format: {manifest.get('format')}")
+    if manifest.get("hash") != VOCABULARY_HASH:
+        raise ValueError(f"Model bundle uses vocabulary hash {manifest.get('hash')}, expected {VOCABULARY_HASH}")
+
+    weightings = {}
+    for name, entry in manifest["vectorizers"].items():
+        weightings[name] = TfidfWeighting(
+            n_features=entry["n_features"],
+            idf=_load_array(directory, entry["idf"]) if entry["idf"] else None,
+            binary=entry["binary"],
+            sublinear_tf=entry["sublinear_tf"],
+            norm=entry["norm"],
+            dtype=entry["dtype"]
+        )
+
+    groups = []
+    for group in manifest["groups"]:
+        files = group["vocabulary"]
+        vocabulary = PerfectHashVocabulary(
+            _load_array(directory, files["strings"]),
+            _load_array(directory, files["offsets"]),
+            _load_array(directory, files["displacements"]),
+            _load_array(directory, files["columns"]),
+            cache_size=lookup_cache_size
+        )
+        groups.append((group["names"], compile_analyzer(group["analyzer"]), vocabulary))
+
+    models = {
+        name: {key: _load_array(directory, filename) for key, filename in files.items()}
+        for name, files in manifest["models"].items()
+    }
+    return ModelBundle(SharedFeaturizer(groups, weightings), models, manifest_path, manifest.get("sources"))
@@ -1,100 +1,606 @@
+import asyncio
 import pickle
+import hashlib
 import logging
-from typing import Any, Optional
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 import os
 import joblib
+import numpy as np
+from config.settings import settings
+from models.schemas import FakeDetectionResult
+from utils.metrics import metrics
+from utils.model_bundle import MANIFEST_NAME, changed_sources, load_model_bundle
+from utils.text_features import SharedFeaturizer, distinct_rows
 
 logger = logging.getLogger(__name__)
 
-class ModelLoader:
-    def __init__(self):
+class LinearModelScorer:
+    """Scores a linear classifier from dense copies of its weights.
+
+    One margin computation (features @ coef.T + intercept) gives both the
+    predicted label and the confidence, instead of separate predict and
+    decision_function calls on the sklearn estimator.
+    """
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, classes: np.ndarray):
+        # Bundled arrays are memory-mapped float64 already, so nothing is copied
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64).ravel()
+        self.classes = np.asarray(classes)
+    
+    @classmethod
+    def from_model(cls, model: Any) -> Optional["LinearModelScorer"]:
+        """Build a scorer for decision-function models like LinearSVC, None otherwise"""
+        if model is None or hasattr(model, "predict_proba"):
+            return None
+        if not all(hasattr(model, attr) for attr in ("coef_", "intercept_", "classes_")):
+            return None
+        coef = model.coef_
+        if hasattr(coef, "toarray"):
+            # Sparsified models keep coef_ as a scipy matrix
+            coef = coef.toarray()
+        return cls(coef, model.intercept_, model.classes_)
+    
+    def margins(self, features) -> np.ndarray:
+        """Signed distances to the decision boundary, shaped like decision_function"""
+        scores = np.asarray(features @ self.coef.T) + self.intercept
+        return scores.ravel() if scores.shape[1] == 1 else scores
+    
+    def predict_from_margins(self, margins: np.ndarray) -> np.ndarray:
+        if margins.ndim == 1:
+            return self.classes[(margins > 0).astype(int)]
+        return self.classes[margins.argmax(axis=1)]
+    
+    @staticmethod
+    def sigmoid(scores: np.ndarray) -> np.ndarray:
+        return 1 / (1 + np.exp(-scores))
+
+# Models whose readiness is tracked separately
+MODEL_NAMES = ("fake", "sentiment", "category")
+
+# Pickles the compiled bundle replaces; convert_models.py records them in its manifest
+BUNDLED_PICKLES = (
+    "svm_fake_review_model.pkl",
+    "tfidf_vectorizer.pkl",
+    "best_model_svmsentiment.pkl",
+    "tf_idf_vectorizersentiment.pkl"
+)
+
+class ModelSlot:
+    """One loaded version of the models, plus counters for the traffic it served.
+
+    A slot is fully built before it is published, so scoring code never sees
+    half-loaded state. model_states reports each model as "pending", "ready",
+    "fallback" (artifact missing) or "failed", and has_model() only turns
+    true for models that are ready.
+    """
+    def __init__(self, models_dir: Optional[str] = None, bundle_dir: Optional[str] = None):
+        self.models_dir = models_dir or settings.MODELS_DIR
+        self.bundle_dir = bundle_dir or settings.MODEL_BUNDLE_DIR
         self.fake_detection_model = None
         self.sentiment_model = None
         self.category_model = None
         self.vectorizer = None 
         self.sentiment_vectorizer = None
+        self.fake_scorer = None
+        self.sentiment_scorer = None
+        self.featurizer = None
+        self.model_version = "fallback"
         self.models_loaded = False
+        self.model_states = {name: "pending" for name in MODEL_NAMES}
+        self.loaded_at = None
+        self.load_seconds = None
+        
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.reviews = 0
+        self.fake_count = 0
+        self.sentiment_counts: Dict[str, int] = {}
+        self.latency_seconds = 0.0
+        self.max_latency_seconds = 0.0
     
-    def load_models(self) -> bool:
-        """Load ML models from files (placeholder for now)"""
+    def load(self) -> bool:
+        """Load ML models from the compiled bundle if present, else from the pickles"""
+        started = time.time()
         try:
-            logger.info("Loading ML models...")
-            models_dir = "ml_models"
-        
-            # Load model with joblib instead of pickle
-            fake_model_path = os.path.join(models_dir, "svm_fake_review_model.pkl")
-            if os.path.exists(fake_model_path):
-                try:
-                    # Direct joblib load
-                    self.fake_detection_model = joblib.load(fake_model_path)
-                    logger.info("✅ Fake detection model loaded successfully using joblib")
-                except Exception as e:
-                    logger.error(f"❌ Failed to load fake detection model with joblib: {str(e)}")
-
-            # Load vectorizer - use your actual filename
-            vectorizer_path = os.path.join(models_dir, "tfidf_vectorizer.pkl")
-            if os.path.exists(vectorizer_path):
-                try:
-                    self.vectorizer = joblib.load(vectorizer_path)
-                    logger.info("✅ TF-IDF Vectorizer loaded successfully")
-                except Exception as e:
-                    logger.error(f"❌ Failed to load vectorizer: {str(e)}")
-        
-            # Load sentiment model
-            sentiment_model_path = os.path.join(models_dir, "best_model_svmsentiment.pkl")
-            if os.path.exists(sentiment_model_path):
-                try:
-                    # Try joblib first
-                    self.sentiment_model = joblib.load(sentiment_model_path)
-                    logger.info("✅ Sentiment model loaded successfully using joblib")
-                except Exception as e:
-                    logger.error(f"❌ Failed to load sentiment model with joblib: {str(e)}")
-                    
-            # Load sentiment vectorizer (new)
-            sentiment_vectorizer_path = os.path.join(models_dir, "tf_idf_vectorizersentiment.pkl")
-            if os.path.exists(sentiment_vectorizer_path):
-                try:
-                    self.sentiment_vectorizer = joblib.load(sentiment_vectorizer_path)  # Use new property
-                    logger.info("✅ Sentiment TF-IDF Vectorizer loaded successfully")
-                except Exception as e:
-                    logger.error(f"❌ Failed to load sentiment vectorizer: {str(e)}")
+            logger.info(f"Loading ML models from {self.models_dir}...")
+            models_dir = self.models_dir
+            
+            bundle_manifest = os.path.join(self.bundle_dir, MANIFEST_NAME)
+            if os.path.exists(bundle_manifest) and self._load_bundle(self.bundle_dir, models_dir):
+                artifacts = {"bundle": (self.featurizer, bundle_manifest)}
+            else:
+                artifacts = self._load_pickled_models(models_dir)
+                self._build_scorers()
+                self._build_featurizer()
 
-            # Load category model
             category_model_path = os.path.join(models_dir, "category_model.pkl")
-            if os.path.exists(category_model_path):
-                try:
-                    # Try joblib first
-                    self.category_model = joblib.load(category_model_path)
-                    logger.info("✅ Category model loaded successfully using joblib")
-                except Exception:
-                    try:
-                        # Fall back to pickle
-                        with open(category_model_path, 'rb') as f:
-                            self.category_model = pickle.load(f)
-                            logger.info("✅ Category model loaded successfully using pickle")
-                    except Exception as e:
-                        logger.error(f"❌ Failed to load category model: {str(e)}")
-            else:
-                logger.warning(f"⚠️ Category model not found at {category_model_path}")
+            self._load_category_model(category_model_path)
+            artifacts["category"] = (self.category_model, category_model_path)
+            self.model_version = self._compute_model_version(artifacts)
+            logger.info(f"Model version: {self.model_version}")
         
             # Set models_loaded to True if at least one model was loaded
-            models_found = any([self.fake_detection_model, self.sentiment_model, self.category_model])
+            models_found = any([self._can_score("fake"), self._can_score("sentiment"), self.category_model])
+            self._finish_loading("fallback", started)
             if not models_found:
                 logger.warning("No ML models were loaded. Using fallback implementations.")
                 self.models_loaded = False
                 return False                
             else:
-                logger.info("✅ ML model loading complete")
+                logger.info(f"✅ ML model loading complete in {self.load_seconds:.2f}s")
                 self.models_loaded = True
                 return True
             
         except Exception as e:
             logger.error(f"Failed to load ML models: {str(e)}")
+            self._finish_loading("failed", started)
             self.models_loaded = False
             return False
     
+    def _finish_loading(self, missing_state: str, started: float):
+        """Publish per-model states once everything they depend on is in place"""
+        usable = {
+            "fake": self._can_score("fake"),
+            "sentiment": self._can_score("sentiment"),
+            "category": self.category_model is not None
+        }
+        self.model_states = {name: "ready" if usable[name] else missing_state for name in MODEL_NAMES}
+        self.load_seconds = time.time() - started
+        self.loaded_at = time.time()
+    
+    def _load_bundle(self, bundle_dir: str, models_dir: str) -> bool:
+        """Memory-map the compiled vectorizers and linear models, unless the pickles have changed since"""
+        try:
+            bundle = load_model_bundle(bundle_dir, settings.MODEL_BUNDLE_LOOKUP_CACHE_SIZE)
+        except Exception as e:
+            logger.error(f"❌ Failed to load model bundle, falling back to pickles: {str(e)}")
+            return False
+        
+        changed = changed_sources(bundle.sources, [os.path.join(models_dir, name) for name in BUNDLED_PICKLES])
+        if changed:
+            logger.warning(
+                f"⚠️ Model bundle in {bundle_dir} was not built from the current {', '.join(changed)}; "
+                f"loading the pickles instead. Re-run convert_models.py to rebuild it"
+            )
+            return False
+        
+        self.featurizer = bundle.featurizer
+        self.fake_scorer = self._bundle_scorer(bundle, "fake")
+        self.sentiment_scorer = self._bundle_scorer(bundle, "sentiment")
+        logger.info(f"✅ Model bundle memory-mapped from {bundle_dir} ({', '.join(sorted(bundle.models))})")
+        return True
+    
+    @staticmethod
+    def _bundle_scorer(bundle, name: str) -> Optional[LinearModelScorer]:
+        if name not in bundle.models or name not in bundle.featurizer.weightings:
+            return None
+        arrays = bundle.models[name]
+        return LinearModelScorer(arrays["coef"], arrays["intercept"], arrays["classes"])
+    
+    def _load_pickled_models(self, models_dir: str) -> Dict[str, Tuple[Any, str]]:
+        # Load model with joblib instead of pickle
+        fake_model_path = os.path.join(models_dir, "svm_fake_review_model.pkl")
+        if os.path.exists(fake_model_path):
+            try:
+                # Direct joblib load
+                self.fake_detection_model = joblib.load(fake_model_path)
+                logger.info("✅ Fake detection model loaded successfully using joblib")
+            except Exception as e:
+                logger.error(f"❌ Failed to load fake detection model with joblib: {str(e)}")
+
+        # Load vectorizer - use your actual filename
+        vectorizer_path = os.path.join(models_dir, "tfidf_vectorizer.pkl")
+        if os.path.exists(vectorizer_path):
+            try:
+                self.vectorizer = joblib.load(vectorizer_path)
+                logger.info("✅ TF-IDF Vectorizer loaded successfully")
+            except Exception as e:
+                logger.error(f"❌ Failed to load vectorizer: {str(e)}")
+        
+        # Load sentiment model
+        sentiment_model_path = os.path.join(models_dir, "best_model_svmsentiment.pkl")
+        if os.path.exists(sentiment_model_path):
+            try:
+                # Try joblib first
+                self.sentiment_model = joblib.load(sentiment_model_path)
+                logger.info("✅ Sentiment model loaded successfully using joblib")
+            except Exception as e:
+                logger.error(f"❌ Failed to load sentiment model with joblib: {str(e)}")
+                
+        # Load sentiment vectorizer (new)
+        sentiment_vectorizer_path = os.path.join(models_dir, "tf_idf_vectorizersentiment.pkl")
+        if os.path.exists(sentiment_vectorizer_path):
+            try:
+                self.sentiment_vectorizer = joblib.load(sentiment_vectorizer_path)  # Use new property
+                logger.info("✅ Sentiment TF-IDF Vectorizer loaded successfully")
+            except Exception as e:
+                logger.error(f"❌ Failed to load sentiment vectorizer: {str(e)}")
+        
+        return {
+            "fake_detection": (self.fake_detection_model, fake_model_path),
+            "vectorizer": (self.vectorizer, vectorizer_path),
+            "sentiment": (self.sentiment_model, sentiment_model_path),
+            "sentiment_vectorizer": (self.sentiment_vectorizer, sentiment_vectorizer_path)
+        }
+    
+    def _load_category_model(self, category_model_path: str):
+        # Load category model
+        if os.path.exists(category_model_path):
+            try:
+                # Try joblib first
+                self.category_model = joblib.load(category_model_path)
+                logger.info("✅ Category model loaded successfully using joblib")
+            except Exception:
+                try:
+                    # Fall back to pickle
+                    with open(category_model_path, 'rb') as f:
+                        self.category_model = pickle.load(f)
+                        logger.info("✅ Category model loaded successfully using pickle")
+                except Exception as e:
+                    logger.error(f"❌ Failed to load category model: {str(e)}")
+        else:
+            logger.warning(f"⚠️ Category model not found at {category_model_path}")
+    
+    @staticmethod
+    def _compute_model_version(artifacts: Dict[str, Tuple[Any, str]]) -> str:
+        """Fingerprint the loaded artifacts so cached predictions follow model changes"""
+        digest = hashlib.sha256()
+        for name, (artifact, path) in sorted(artifacts.items()):
+            if artifact is None:
+                digest.update(f"{name}:fallback;".encode())
+                continue
+            stat = os.stat(path)
+            digest.update(f"{name}:{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:16]
+    
+    def _build_scorers(self):
+        """Cache dense coefficient matrices for the linear models"""
+        self.fake_scorer = LinearModelScorer.from_model(self.fake_detection_model)
+        self.sentiment_scorer = LinearModelScorer.from_model(self.sentiment_model)
+        if self.fake_scorer is not None:
+            logger.info(f"✅ Fake detection scorer cached ({self.fake_scorer.coef.shape[1]} features)")
+        if self.sentiment_scorer is not None:
+            logger.info(f"✅ Sentiment scorer cached ({self.sentiment_scorer.coef.shape[1]} features)")
+    
+    def _build_featurizer(self):
+        """Share tokenization between the fake-detection and sentiment vectorizers"""
+        self.featurizer = None
+        if self.vectorizer is None and self.sentiment_vectorizer is None:
+            return
+        try:
+            self.featurizer = SharedFeaturizer.from_vectorizers({
+                "fake": self.vectorizer,
+                "sentiment": self.sentiment_vectorizer
+            })
+        except Exception as e:
+            logger.error(f"❌ Failed to build shared featurizer, using vectorizers directly: {str(e)}")
+    
+    def transform_reviews(self, processed_reviews: List[str], names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Vectorize preprocessed reviews for the named vectorizers ("fake", "sentiment")"""
+        vectorizers = {"fake": self.vectorizer, "sentiment": self.sentiment_vectorizer}
+        if self.featurizer is not None:
+            with metrics.stage("+".join(names or vectorizers), "vectorize"):
+                return self.featurizer.transform(processed_reviews, names)
+        
+        features = {}
+        for name in names or vectorizers:
+            if vectorizers[name] is not None:
+                with metrics.stage(name, "vectorize"):
+                    features[name] = vectorizers[name].transform(processed_reviews)
+        return features
+    
+    def transform_unique_reviews(
+        self,
+        processed_reviews: List[str],
+        names: Optional[Sequence[str]] = None
+    ) -> Tuple[Dict[str, Any], List[int]]:
+        """Vectorize each distinct analyzer output once; also returns the feature row of every review"""
+        if self.featurizer is not None:
+            with metrics.stage("+".join(names or ("fake", "sentiment")), "vectorize"):
+                return self.featurizer.transform_unique(processed_reviews, names)
+        
+        # Plain vectorizers only share rows between identical texts
+        rows, first_positions = distinct_rows(processed_reviews)
+        features = self.transform_reviews([processed_reviews[position] for position in first_positions], names)
+        return features, rows
+    
+    def score_fake_reviews(self, features) -> np.ndarray:
+        """Return the fake probability for each row of features"""
+        model = self.fake_detection_model
+        if self.fake_scorer is None and hasattr(model, 'predict_proba'):
+            with metrics.stage("fake", "predict"):
+                probabilities = model.predict_proba(features)
+            return probabilities[:, 1] if probabilities.shape[1] > 1 else probabilities[:, 0]
+        
+        # For models like LinearSVC, squash the margin with a sigmoid
+        with metrics.stage("fake", "predict"):
+            if self.fake_scorer is not None:
+                margins = self.fake_scorer.margins(features)
+            else:
+                margins = model.decision_function(features)
+        with metrics.stage("fake", "confidence"):
+            return LinearModelScorer.sigmoid(margins)
+    
+    def score_sentiment(self, features) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the predicted label and its confidence for each row of features"""
+        model = self.sentiment_model
+        if self.sentiment_scorer is None and hasattr(model, 'predict_proba'):
+            with metrics.stage("sentiment", "predict"):
+                probabilities = model.predict_proba(features)
+            return model.classes_[probabilities.argmax(axis=1)], probabilities.max(axis=1)
+        
+        with metrics.stage("sentiment", "predict"):
+            if self.sentiment_scorer is not None:
+                margins = self.sentiment_scorer.margins(features)
+                predictions = self.sentiment_scorer.predict_from_margins(margins)
+            else:
+                # Non-linear decision-function models still need their own predict
+                margins = model.decision_function(features)
+                predictions = model.predict(features)
+        
+        # Confidence is the sigmoid of the largest absolute margin
+        with metrics.stage("sentiment", "confidence"):
+            max_margins = np.abs(margins).max(axis=1) if margins.ndim > 1 else np.abs(margins)
+            return predictions, LinearModelScorer.sigmoid(max_margins)
+    
+    def has_model(self, name: str) -> bool:
+        """Whether the named model has finished loading and can score reviews"""
+        return self.model_states.get(name) == "ready"
+    
+    def pickled_models(self) -> List[str]:
+        """The "fake" and "sentiment" models loaded from pickles rather than the memory-mapped bundle"""
+        pickled = {
+            "fake": (self.fake_detection_model, self.vectorizer),
+            "sentiment": (self.sentiment_model, self.sentiment_vectorizer)
+        }
+        return [name for name, artifacts in pickled.items() if any(artifact is not None for artifact in artifacts)]
+    
+    def _can_score(self, name: str) -> bool:
+        """Whether the "fake" or "sentiment" artifacts are in place, from pickles or a bundle"""
+        if name == "fake":
+            model, vectorizer, scorer = self.fake_detection_model, self.vectorizer, self.fake_scorer
+        else:
+            model, vectorizer, scorer = self.sentiment_model, self.sentiment_vectorizer, self.sentiment_scorer
+        if model is not None and vectorizer is not None:
+            return True
+        return scorer is not None and self.featurizer is not None and name in self.featurizer.weightings
+    
+    def record(self, analyses: List[Any], seconds: float):
+        """Count a scored batch against this version"""
+        with self._stats_lock:
+            self.batches += 1
+            self.reviews += len(analyses)
+            self.latency_seconds += seconds
+            self.max_latency_seconds = max(self.max_latency_seconds, seconds)
+            for analysis in analyses:
+                if analysis.is_fake == FakeDetectionResult.FAKE:
+                    self.fake_count += 1
+                sentiment = analysis.sentiment.value
+                self.sentiment_counts[sentiment] = self.sentiment_counts.get(sentiment, 0) + 1
+    
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "version": self.model_version,
+                "models_dir": self.models_dir,
+                "states": self.model_states,
+                "loaded_at": self.loaded_at,
+                "load_seconds": self.load_seconds,
+                "batches": self.batches,
+                "reviews": self.reviews,
+                "fake_ratio": round(self.fake_count / self.reviews, 4) if self.reviews else 0.0,
+                "sentiment_distribution": dict(self.sentiment_counts),
+                "avg_latency_ms": round(self.latency_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+                "max_latency_ms": round(self.max_latency_seconds * 1000, 2)
+            }
+
+class ModelLoader:
+    """Serves the ML models from an active and an optional candidate slot, swappable at runtime"""
+    def __init__(self):
+        self.active = ModelSlot()
+        self.candidate: Optional[ModelSlot] = None
+        self.candidate_traffic = 0.0
+        self.status = "idle"
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._loaded_event = threading.Event()
+        self._bound = threading.local()
+    
+    @property
+    def current(self) -> ModelSlot:
+        """The slot bound to this thread by using(), else the active slot"""
+        return getattr(self._bound, "slot", None) or self.active
+    
+    @property
+    def fake_detection_model(self):
+        return self.current.fake_detection_model
+    
+    @property
+    def sentiment_model(self):
+        return self.current.sentiment_model
+    
+    @property
+    def category_model(self):
+        return self.current.category_model
+    
+    @property
+    def model_version(self) -> str:
+        return self.current.model_version
+    
+    @property
+    def model_states(self) -> Dict[str, str]:
+        if self.is_loading():
+            return {name: "loading" for name in MODEL_NAMES}
+        return self.current.model_states
+    
+    @property
+    def load_seconds(self) -> Optional[float]:
+        return self.current.load_seconds
+    
+    def has_model(self, name: str) -> bool:
+        return self.current.has_model(name)
+    
+    def transform_reviews(self, processed_reviews: List[str], names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        return self.current.transform_reviews(processed_reviews, names)
+    
+    def transform_unique_reviews(
+        self,
+        processed_reviews: List[str],
+        names: Optional[Sequence[str]] = None
+    ) -> Tuple[Dict[str, Any], List[int]]:
+        return self.current.transform_unique_reviews(processed_reviews, names)
+    
+    def score_fake_reviews(self, features) -> np.ndarray:
+        return self.current.score_fake_reviews(features)
+    
+    def score_sentiment(self, features) -> Tuple[np.ndarray, np.ndarray]:
+        return self.current.score_sentiment(features)
+    
+    def load_models(self) -> bool:
+        """Load the models from MODELS_DIR into the active slot (the initial load)"""
+        self.begin_loading()
+        try:
+            slot = ModelSlot()
+            loaded = slot.load()
+            self.active = slot
+            return loaded
+        finally:
+            self.status = "loaded"
+            self._loaded_event.set()
+    
+    def slot_sources(self) -> Dict[str, Optional[Tuple[str, str]]]:
+        """(models_dir, bundle_dir) of the published slots, for worker processes to load"""
+        candidate = self.candidate
+        return {
+            "active": (self.active.models_dir, self.active.bundle_dir),
+            "candidate": (candidate.models_dir, candidate.bundle_dir) if candidate is not None else None
+        }
+
+    def load_slot_sources(self, sources: Dict[str, Optional[Tuple[str, str]]]):
+        """Load the slots described by another process's slot_sources()"""
+        self.begin_loading()
+        try:
+            active = ModelSlot(*sources["active"])
+            active.load()
+            self.active = active
+            if sources["candidate"] is not None:
+                candidate = ModelSlot(*sources["candidate"])
+                candidate.load()
+                self.candidate = candidate
+        finally:
+            self.status = "loaded"
+            self._loaded_event.set()
+
+    def begin_loading(self):
+        """Mark models as loading; called before handing load_models to a background task"""
+        self._loaded_event.clear()
+        self.status = "loading"
+    
+    def reload_models(
+        self,
+        models_dir: Optional[str] = None,
+        bundle_dir: Optional[str] = None,
+        traffic: Optional[float] = None
+    ) -> ModelSlot:
+        """Load a new version into a fresh slot, then publish it with one pointer flip.
+
+        Without traffic the new slot replaces the active one. With traffic
+        it becomes the candidate and receives that share (0-1) of batches.
+        Raises ValueError if nothing could be loaded, leaving the current
+        slots untouched.
+        """
+        with self._reload_lock:
+            slot = ModelSlot(models_dir, bundle_dir)
+            if not slot.load():
+                raise ValueError(f"No models could be loaded from {slot.models_dir}")
+            
+            if traffic is None:
+                self.active = slot
+                logger.info(f"🔄 Model version {slot.model_version} is now active")
+            else:
+                self.candidate_traffic = traffic
+                self.candidate = slot
+                logger.info(f"🔄 Model version {slot.model_version} is the candidate at {traffic:.0%} of traffic")
+            self.reloads += 1
+            return slot
+    
+    def promote_candidate(self) -> ModelSlot:
+        """Make the candidate the active version"""
+        with self._reload_lock:
+            if self.candidate is None:
+                raise ValueError("There is no candidate model version to promote")
+            self.active, self.candidate = self.candidate, None
+            self.candidate_traffic = 0.0
+            logger.info(f"🔄 Model version {self.active.model_version} promoted to active")
+            return self.active
+    
+    def drop_candidate(self):
+        with self._reload_lock:
+            self.candidate = None
+            self.candidate_traffic = 0.0
+    
+    def set_candidate_traffic(self, traffic: float):
+        with self._reload_lock:
+            if self.candidate is None:
+                raise ValueError("There is no candidate model version to route traffic to")
+            self.candidate_traffic = traffic
+    
+    def select_slot(self) -> ModelSlot:
+        """Pick the slot for the next batch according to the traffic split"""
+        candidate = self.candidate
+        if candidate is not None and random.random() < self.candidate_traffic:
+            return candidate
+        return self.active
+    
+    def slot_for(self, model_version: Optional[str]) -> ModelSlot:
+        """Find a published slot by version, falling back to the active one"""
+        candidate = self.candidate
+        if candidate is not None and candidate.model_version == model_version:
+            return candidate
+        return self.active
+    
+    @contextmanager
+    def using(self, slot: ModelSlot) -> Iterator[ModelSlot]:
+        """Route this thread's model reads to slot for the duration of the block"""
+        previous = getattr(self._bound, "slot", None)
+        self._bound.slot = slot
+        try:
+            yield slot
+        finally:
+            self._bound.slot = previous
+    
+    def slots_stats(self) -> dict:
+        candidate = self.candidate
+        return {
+            "active": self.active.stats(),
+            "candidate": candidate.stats() if candidate is not None else None,
+            "candidate_traffic": self.candidate_traffic if candidate is not None else 0.0,
+            "reloads": self.reloads
+        }
+    
     def is_ready(self) -> bool:
-        return self.models_loaded
+        return self.active.models_loaded
+    
+    def is_loading(self) -> bool:
+        return self.status == "loading"
+    
+    def is_warm(self) -> bool:
+        """Whether loading has finished, with or without any models"""
+        return self.status == "loaded"
+    
+    async def wait_until_loaded(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for background loading to finish"""
+        deadline = time.monotonic() + timeout
+        while not self._loaded_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(0.05, remaining))
+        return True
 
 # Global model loader instance
 model_loader = ModelLoader()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import hashlib
+import logging
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from utils.keyword_matcher import tokenize
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+_BIT_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+# Feature hashes are reused across reviews; cleared when it grows past this
+FEATURE_HASH_CACHE_SIZE = 200000
+_feature_hashes: Dict[str, int] = {}
+
+def _feature_hash(feature: str) -> int:
+    value = _feature_hashes.get(feature)
+    if value is None:
+        if len(_feature_hashes) >= FEATURE_HASH_CACHE_SIZE:
+            _feature_hashes.clear()
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        _feature_hashes[feature] = value
+    return value
+
+def _features(text: str) -> List[str]:
+    tokens = tokenize(text)
+    return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+def simhashes(texts: Sequence[str]) -> List[int]:
+    """64-bit SimHash of each text's words and word pairs.
+
+    Case, punctuation and spacing are ignored, so templated reviews that
+    only differ in those get the same fingerprint; a changed word or two
+    flips only a few bits. The bit votes of the whole batch are summed in
+    one numpy pass.
+    """
+    hashes = []
+    lengths = []
+    for text in texts:
+        features = _features(text)
+        hashes.extend(map(_feature_hash, features))
+        lengths.append(len(features))
+    if not hashes:
+        return [0] * len(texts)
+
+    bits = (np.array(hashes, dtype=np.uint64)[:, None] >> _BIT_SHIFTS) & np.uint64(1)
+    votes = bits.astype(np.int32) * 2 - 1
+    # Sum each text's rows; texts without features get no votes
+    lengths = np.array(lengths)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    totals = np.zeros((len(texts), FINGERPRINT_BITS), dtype=np.int64)
+    present = lengths > 0
+    totals[present] = np.add.reduceat(votes, starts[present], axis=0)
+    fingerprints = np.packbits((totals > 0)[:, ::-1], axis=1).view(">u8").ravel()
+    return fingerprints.tolist()
+
+def simhash(text: str) -> int:
+    return simhashes([text])[0]
+
+class NearDuplicateIndex:
+    """Groups texts whose SimHash fingerprints differ in at most max_distance bits.
+
+    Each group is represented by its first text (the leader); a new text
+    joins the first leader within range, otherwise it starts a group.
+    Comparing against leaders only keeps groups from drifting through
+    chains of small edits. Fingerprints are split into max_distance + 1
+    bands, and any two within range agree on at least one band, so only
+    leaders sharing a band are compared.
+    """
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self._band_width = FINGERPRINT_BITS // self.band_count
+        self._bands: List[Dict[int, List[Tuple[int, int]]]] = [{} for _ in range(self.band_count)]
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._band_width) - 1
+        return [(fingerprint >> (band * self._band_width)) & mask for band in range(self.band_count)]
+
+    def add(self, text: str, position: int) -> int:
+        """Group id of text: the position of its group's leader"""
+        return self.add_fingerprint(simhash(text), position)
+
+    def add_fingerprint(self, fingerprint: int, position: int) -> int:
+        band_values = self._band_values(fingerprint)
+        for band, value in zip(self._bands, band_values):
+            for leader_fingerprint, leader_position in band.get(value, ()):
+                if bin(fingerprint ^ leader_fingerprint).count("1") <= self.max_distance:
+                    return leader_position
+
+        for band, value in zip(self._bands, band_values):
+            band.setdefault(value, []).append((fingerprint, position))
+        return position
+
+def cluster_reviews(reviews: Sequence[str], max_distance: int = 3) -> List[int]:
+    """Cluster id of every review: the index of the first near-duplicate of it in reviews"""
+    index = NearDuplicateIndex(max_distance)
+    cluster_ids = [
+        index.add_fingerprint(fingerprint, position)
+        for position, fingerprint in enumerate(simhashes(reviews))
+    ]
+    clusters = len(set(cluster_ids))
+    if clusters < len(reviews):
+        logger.debug(f"Near-duplicate clustering: {len(reviews)} reviews in {clusters} clusters")
+    return cluster_ids
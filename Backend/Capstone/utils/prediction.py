@@ -1,14 +1,95 @@
 import random
 import re
+import time
+import hashlib
+import threading
 import numpy as np
-from typing import List, Tuple
-from textblob import TextBlob
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 from models.schemas import SentimentType, CategoryType, FakeDetectionResult, SingleReviewAnalysis
 from utils.model_loader import model_loader
+from utils.keyword_matcher import KeywordMatcher, load_keyword_sets
+from utils.lexicon_sentiment import lexicon_sentiment
+from utils.metrics import metrics
+from utils.near_duplicates import cluster_reviews
+from utils.text_features import distinct_rows
+from config.settings import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+HEURISTIC_UNCERTAINTY_MODES = ("hash", "random", "none")
+
+class PredictionCache:
+    """Thread-safe LRU of per-review predictions keyed by text hash and model version"""
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(review: str, model_version: str) -> str:
+        # The exact text the scorers see: the '!' ratio, length and tokens all
+        # change with whitespace or Unicode form, so no normalization here
+        payload = f"{model_version}\0{review}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+    
+    def get(self, key: str) -> Optional[tuple]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: tuple):
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value)
+            
+            # Evict least recently used entries; every entry is a fixed-size
+            # hash and tuple of scores, so the count also bounds memory
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+    
+    def _remove(self, key: str):
+        del self._entries[key]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
 class ReviewAnalyzer:
     def __init__(self):
         self.fake_keywords = [
@@ -30,45 +111,92 @@ class ReviewAnalyzer:
             "shipping", "delivery", "fast", "slow", "arrived", "package",
             "packaging", "box", "delayed", "quick", "overnight"
         ]
+        
+        # Larger lists can be supplied through KEYWORDS_FILE
+        keyword_sets = load_keyword_sets({
+            "fake": self.fake_keywords,
+            "quality": self.quality_keywords,
+            "price": self.price_keywords,
+            "delivery": self.delivery_keywords
+        }, settings.KEYWORDS_FILE)
+        self.fake_keywords = keyword_sets["fake"]
+        self.quality_keywords = keyword_sets["quality"]
+        self.price_keywords = keyword_sets["price"]
+        self.delivery_keywords = keyword_sets["delivery"]
+        # One automaton scores all four sets in a single pass per review
+        self.keyword_matcher = KeywordMatcher(keyword_sets)
+        
+        self.uncertainty_mode = settings.HEURISTIC_UNCERTAINTY_MODE.lower()
+        if self.uncertainty_mode not in HEURISTIC_UNCERTAINTY_MODES:
+            logger.warning(f"⚠️ Unknown HEURISTIC_UNCERTAINTY_MODE '{settings.HEURISTIC_UNCERTAINTY_MODE}', using 'hash'")
+            self.uncertainty_mode = "hash"
+        self.uncertainty_seed = settings.HEURISTIC_UNCERTAINTY_SEED
+        
+        self.prediction_cache = PredictionCache(
+            max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS
+        )
+        # Set when a scoring step fell back to default values, so they aren't cached
+        self._scoring_state = threading.local()
+    
+    def _log_scoring_error(self, message: str):
+        logger.error(message)
+        self._scoring_state.degraded = True
     
     def detect_fake_review(self, review: str) -> Tuple[FakeDetectionResult, float]:
+        return self.detect_fake_reviews([review])[0]
+    
+    def detect_fake_reviews(
+        self,
+        reviews: List[str],
+        processed_reviews: Optional[List[str]] = None,
+        features: Optional[Any] = None,
+        keyword_counts: Optional[List[Dict[str, int]]] = None
+    ) -> List[Tuple[FakeDetectionResult, float]]:
+        """
+        Detect fake reviews for a whole batch with one vectorizer and one model pass
+        """
         try:
-            if model_loader.fake_detection_model is not None and model_loader.vectorizer is not None:
-                # Process review text 
-                processed_review = review.lower()  
-                
-
-                # Transform text to numerical features using the vectorizer
-                features = model_loader.vectorizer.transform([processed_review])
-                # Make prediction using the model
-                prediction = model_loader.fake_detection_model.predict(features)[0]
-
-                # Check if model supports predict_proba
-                if hasattr(model_loader.fake_detection_model, 'predict_proba'):
-                    # Use probability if available
-                    probabilities = model_loader.fake_detection_model.predict_proba(features)[0]
-                    fake_probability = probabilities[1] if len(probabilities) > 1 else probabilities[0]
-                else:
-                    # For models like LinearSVC, use decision_function instead
-                    # Convert decision function score to a probability-like value between 0 and 1
-                    decision_score = model_loader.fake_detection_model.decision_function(features)[0]
-                    fake_probability = 1 / (1 + np.exp(-decision_score))  # Sigmoid function
+            # Process review text 
+            if processed_reviews is None:
+                processed_reviews = [review.lower() for review in reviews]
+            
+            if model_loader.has_model("fake"):
+                # Transform the whole batch into one sparse matrix
+                if features is None:
+                    features = model_loader.transform_reviews(processed_reviews, ["fake"])["fake"]
+                # One margin pass gives the fake probability for every row
+                fake_probabilities = model_loader.score_fake_reviews(features)
                 
-                result = FakeDetectionResult.FAKE if fake_probability > 0.5 else FakeDetectionResult.REAL
-                confidence = fake_probability if result == FakeDetectionResult.FAKE else (1.0 - fake_probability)
+                results = []
+                for fake_probability in fake_probabilities:
+                    result = FakeDetectionResult.FAKE if fake_probability > 0.5 else FakeDetectionResult.REAL
+                    confidence = fake_probability if result == FakeDetectionResult.FAKE else (1.0 - fake_probability)
+                    results.append((result, confidence))
                 
-                logger.debug(f"ML model fake detection: {result} with confidence {confidence:.2f}")
-                return result, confidence
+                logger.debug(f"ML model fake detection scored {len(results)} reviews")
+                return results
                 
             # Fall back to heuristic method if model isn't available
             logger.debug("Using heuristic fake detection (ML model not available)")
-            review_lower = review.lower()
+            if keyword_counts is None:
+                keyword_counts = self.count_keywords(processed_reviews)
+            with metrics.stage("fake_heuristic", "predict"):
+                return [
+                    self._heuristic_fake_detection(review, counts["fake"])
+                    for review, counts in zip(reviews, keyword_counts)
+                ]
             
+        except Exception as e:
+            self._log_scoring_error(f"Error in fake detection: {str(e)}")
+            return [(FakeDetectionResult.REAL, 0.5) for _ in reviews]
+    
+    def _heuristic_fake_detection(self, review: str, fake_keyword_count: int) -> Tuple[FakeDetectionResult, float]:
+        try:
             # Check for excessive exclamation marks
             exclamation_ratio = review.count('!') / len(review) if len(review) > 0 else 0
             
-            # Check for fake keywords
-            fake_keyword_count = sum(1 for keyword in self.fake_keywords if keyword in review_lower)
+            # fake_keyword_count is the number of distinct fake keywords in the review
             
             # Check review length (very short or very long could be suspicious)
             length_score = 0
@@ -78,8 +206,8 @@ class ReviewAnalyzer:
             # Calculate fake probability
             fake_score = min(1.0, (exclamation_ratio * 2) + (fake_keyword_count * 0.2) + length_score)
             
-            # Add some randomness to simulate model uncertainty
-            fake_score += random.uniform(-0.2, 0.2)
+            # Add some noise to simulate model uncertainty
+            fake_score += self._heuristic_noise(review)
             fake_score = max(0.0, min(1.0, fake_score))
             
             result = FakeDetectionResult.FAKE if fake_score > 0.5 else FakeDetectionResult.REAL
@@ -88,96 +216,120 @@ class ReviewAnalyzer:
             return result, confidence
             
         except Exception as e:
-            logger.error(f"Error in fake detection: {str(e)}")
+            self._log_scoring_error(f"Error in fake detection: {str(e)}")
             return FakeDetectionResult.REAL, 0.5
     
+    def _heuristic_noise(self, review: str) -> float:
+        """Simulated uncertainty in [-0.2, 0.2], per HEURISTIC_UNCERTAINTY_MODE"""
+        if self.uncertainty_mode == "none":
+            return 0.0
+        if self.uncertainty_mode == "random":
+            return random.uniform(-0.2, 0.2)
+        # Derived from the text (and seed), so identical reviews always score the same
+        payload = f"{self.uncertainty_seed}\0{review}".encode("utf-8")
+        fraction = int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), "big") / 2 ** 64
+        return 0.4 * fraction - 0.2
+    
     def analyze_sentiment(self, review: str) -> Tuple[SentimentType, float]:
+        return self.analyze_sentiments([review])[0]
+    
+    def analyze_sentiments(
+        self,
+        reviews: List[str],
+        processed_reviews: Optional[List[str]] = None,
+        features: Optional[Any] = None
+    ) -> List[Tuple[SentimentType, float]]:
         """
-        Analyze sentiment using ML model with fallback to TextBlob
+        Analyze sentiment for a whole batch using ML model with fallback to the TextBlob lexicon
         """
         try:
             # Try to use ML model if available
-            if model_loader.sentiment_model is not None and model_loader.sentiment_vectorizer is not None:
+            if model_loader.has_model("sentiment"):
                 # Process review text
-                processed_review = review.lower()  # Basic preprocessing
+                if processed_reviews is None:
+                    processed_reviews = [review.lower() for review in reviews]  # Basic preprocessing
 
-                # Transform using the sentiment vectorizer
-                features = model_loader.sentiment_vectorizer.transform([processed_review])
+                # Transform the whole batch using the sentiment vectorizer
+                if features is None:
+                    features = model_loader.transform_reviews(processed_reviews, ["sentiment"])["sentiment"]
                 
-                # Make prediction using the model
-                prediction = model_loader.sentiment_model.predict(features)[0]
-
-                # Log the raw prediction for debugging
-                logger.debug(f"Raw sentiment prediction: {prediction}, type: {type(prediction)}")
-            
-            # Check if model supports predict_proba
-                if hasattr(model_loader.sentiment_model, 'predict_proba'):
-                # Use probability if available
-                    probabilities = model_loader.sentiment_model.predict_proba(features)[0]
-                    confidence = probabilities.max()
-                else:
-                # For models like LinearSVC, use decision_function instead
-                    decision_scores = model_loader.sentiment_model.decision_function(features)
-                # Convert to a confidence-like score between 0 and 1
-                # This depends on your model type, might need adjustment
-                    confidence = 1 / (1 + np.exp(-np.abs(decision_scores).max()))
+                # One margin pass gives both the label and the confidence
+                predictions, confidences = model_loader.score_sentiment(features)
                 
-                # Map prediction to sentiment type - Handle both numeric and string predictions
-                if isinstance(prediction, (int, np.integer)):
-                    # Numeric prediction (0, 1, 2)
-                    # Adjust the order based on your model's encoding
-                    # Common encodings: 0=negative, 1=neutral, 2=positive OR 0=negative, 1=positive, 2=neutral
-                    sentiment_list = [SentimentType.NEGATIVE, SentimentType.NEUTRAL, SentimentType.POSITIVE]
-                    sentiment = sentiment_list[prediction] if 0 <= prediction < 3 else SentimentType.NEUTRAL
-                else:
-                    # String prediction
-                    sentiment_mapping = {
-                        'positive': SentimentType.POSITIVE,
-                        'negative': SentimentType.NEGATIVE,
-                        'neutral': SentimentType.NEUTRAL,
-                        '0': SentimentType.NEGATIVE,
-                        '1': SentimentType.NEUTRAL,
-                        '2': SentimentType.POSITIVE
-                    }
-                    sentiment = sentiment_mapping.get(str(prediction).lower(), SentimentType.NEUTRAL)
+                results = [
+                    (self._map_sentiment_prediction(prediction), confidence)
+                    for prediction, confidence in zip(predictions, confidences)
+                ]
                 
-                logger.debug(f"ML model sentiment analysis: {sentiment} with confidence {confidence:.2f}")
-                return sentiment, confidence
-            
-            # Fall back to TextBlob if model isn't available
-            logger.debug("Using TextBlob for sentiment analysis (ML model not available)")
-            blob = TextBlob(review)
-            polarity = blob.sentiment.polarity
-            
-            if polarity > 0.1:
-                sentiment = SentimentType.POSITIVE
-            elif polarity < -0.1:
-                sentiment = SentimentType.NEGATIVE
-            else:
-                sentiment = SentimentType.NEUTRAL
+                logger.debug(f"ML model sentiment analysis scored {len(results)} reviews")
+                return results
             
-            # Convert polarity to confidence score
-            confidence = abs(polarity)
-            
-            return sentiment, confidence
+            # Fall back to the compiled TextBlob lexicon if model isn't available
+            logger.debug("Using lexicon for sentiment analysis (ML model not available)")
+            with metrics.stage("sentiment_lexicon", "predict"):
+                polarities = lexicon_sentiment.polarities(reviews)
+                return [self._polarity_sentiment(polarity) for polarity in polarities.tolist()]
             
         except Exception as e:
-            logger.error(f"Error in sentiment analysis: {str(e)}")
-            return SentimentType.NEUTRAL, 0.5
+            self._log_scoring_error(f"Error in sentiment analysis: {str(e)}")
+            return [(SentimentType.NEUTRAL, 0.5) for _ in reviews]
+    
+    def _map_sentiment_prediction(self, prediction) -> SentimentType:
+        # Map prediction to sentiment type - Handle both numeric and string predictions
+        if isinstance(prediction, (int, np.integer)):
+            # Numeric prediction (0, 1, 2)
+            # Adjust the order based on your model's encoding
+            # Common encodings: 0=negative, 1=neutral, 2=positive OR 0=negative, 1=positive, 2=neutral
+            sentiment_list = [SentimentType.NEGATIVE, SentimentType.NEUTRAL, SentimentType.POSITIVE]
+            return sentiment_list[prediction] if 0 <= prediction < 3 else SentimentType.NEUTRAL
+        
+        # String prediction
+        sentiment_mapping = {
+            'positive': SentimentType.POSITIVE,
+            'negative': SentimentType.NEGATIVE,
+            'neutral': SentimentType.NEUTRAL,
+            '0': SentimentType.NEGATIVE,
+            '1': SentimentType.NEUTRAL,
+            '2': SentimentType.POSITIVE
+        }
+        return sentiment_mapping.get(str(prediction).lower(), SentimentType.NEUTRAL)
+    
+    def _polarity_sentiment(self, polarity: float) -> Tuple[SentimentType, float]:
+        if polarity > 0.1:
+            sentiment = SentimentType.POSITIVE
+        elif polarity < -0.1:
+            sentiment = SentimentType.NEGATIVE
+        else:
+            sentiment = SentimentType.NEUTRAL
+        
+        # Convert polarity to confidence score
+        confidence = abs(polarity)
+        
+        return sentiment, confidence
     
     def categorize_review(self, review: str) -> CategoryType:
+        return self.categorize_reviews([review])[0]
+    
+    def categorize_reviews(
+        self,
+        reviews: List[str],
+        processed_reviews: Optional[List[str]] = None,
+        keyword_counts: Optional[List[Dict[str, int]]] = None
+    ) -> List[CategoryType]:
         """
-        Categorize review using ML model with fallback to keyword matching
+        Categorize a batch of reviews using ML model with fallback to keyword matching
         """
         try:
+            # Process review text
+            if processed_reviews is None:
+                processed_reviews = [review.lower() for review in reviews]  # Basic preprocessing
+            
             # Try to use ML model if available
             if model_loader.category_model is not None:
-                # Process review text
-                processed_review = review.lower()  # Basic preprocessing
-                
-                # Make prediction using the model
+                # Make predictions for the whole batch
                 # Adjust based on your specific model's API
-                category_pred = model_loader.category_model.predict([processed_review])[0]
+                with metrics.stage("category", "predict"):
+                    category_preds = model_loader.category_model.predict(processed_reviews)
                 
                 # Map prediction to category type (adjust based on your model outputs)
                 category_mapping = {
@@ -188,21 +340,35 @@ class ReviewAnalyzer:
                 }
                 
                 # Convert model output to CategoryType enum
-                category = category_mapping.get(
-                    str(category_pred).lower(), 
-                    CategoryType.GENERAL
-                )
+                categories = [
+                    category_mapping.get(str(category_pred).lower(), CategoryType.GENERAL)
+                    for category_pred in category_preds
+                ]
                 
-                logger.debug(f"ML model categorization: {category}")
-                return category
+                logger.debug(f"ML model categorized {len(categories)} reviews")
+                return categories
             
             # Fall back to keyword approach if model isn't available
             logger.debug("Using keyword matching for categorization (ML model not available)")
-            review_lower = review.lower()
-            
-            quality_score = sum(1 for keyword in self.quality_keywords if keyword in review_lower)
-            price_score = sum(1 for keyword in self.price_keywords if keyword in review_lower)
-            delivery_score = sum(1 for keyword in self.delivery_keywords if keyword in review_lower)
+            if keyword_counts is None:
+                keyword_counts = self.count_keywords(processed_reviews)
+            with metrics.stage("category_keywords", "predict"):
+                return [self._keyword_category(counts) for counts in keyword_counts]
+                
+        except Exception as e:
+            self._log_scoring_error(f"Error in categorization: {str(e)}")
+            return [CategoryType.GENERAL for _ in reviews]
+    
+    def count_keywords(self, processed_reviews: List[str]) -> List[Dict[str, int]]:
+        """Distinct keyword hits per keyword set for each review"""
+        with metrics.stage("keywords", "vectorize"):
+            return [self.keyword_matcher.count(review_lower) for review_lower in processed_reviews]
+    
+    def _keyword_category(self, keyword_counts: Dict[str, int]) -> CategoryType:
+        try:
+            quality_score = keyword_counts["quality"]
+            price_score = keyword_counts["price"]
+            delivery_score = keyword_counts["delivery"]
             
             max_score = max(quality_score, price_score, delivery_score)
             
@@ -218,42 +384,221 @@ class ReviewAnalyzer:
                 return CategoryType.GENERAL
                 
         except Exception as e:
-            logger.error(f"Error in categorization: {str(e)}")
+            self._log_scoring_error(f"Error in categorization: {str(e)}")
             return CategoryType.GENERAL
     
     def analyze_single_review(self, review: str) -> SingleReviewAnalysis:
         """
         Analyze a single review for fake detection, sentiment, and category
         """
-        fake_result, fake_confidence = self.detect_fake_review(review)
-        sentiment, sentiment_score = self.analyze_sentiment(review)
-        category = self.categorize_review(review)
+        return self.analyze_batch([review])[0]
+    
+    def analyze_batch(self, reviews: List[str], model_version: Optional[str] = None) -> List[SingleReviewAnalysis]:
+        """
+        Analyze a batch of reviews, running each model once over the whole batch.
+        model_version pins the batch to that published model slot
+        """
+        slot = model_loader.slot_for(model_version) if model_version else model_loader.current
+        with model_loader.using(slot):
+            return self._analyze_batch(reviews)
+    
+    def _analyze_batch(self, reviews: List[str]) -> List[SingleReviewAnalysis]:
+        if not reviews:
+            return []
         
-        return SingleReviewAnalysis(
-            review_text=review,
-            is_fake=fake_result,
-            sentiment=sentiment,
-            sentiment_score=sentiment_score,
-            category=category,
-            confidence_score=fake_confidence
+        cache = self.prediction_cache if self._is_cacheable() else None
+        if cache is None:
+            return self._score_batch(reviews)[0]
+        
+        # Look up every review and score each distinct cache miss once
+        model_version = model_loader.model_version
+        keys = [PredictionCache.make_key(review, model_version) for review in reviews]
+        cached = {}
+        misses = {}
+        for review, key in zip(reviews, keys):
+            if key in cached or key in misses:
+                continue
+            value = cache.get(key)
+            if value is None:
+                misses[key] = review
+            else:
+                cached[key] = value
+        metrics.count_cache_lookups("prediction", "hit", len(cached))
+        metrics.count_cache_lookups("prediction", "miss", len(misses))
+        
+        if misses:
+            analyses, degraded = self._score_batch(list(misses.values()))
+            for key, analysis in zip(misses, analyses):
+                value = (
+                    analysis.is_fake,
+                    analysis.sentiment,
+                    analysis.sentiment_score,
+                    analysis.category,
+                    analysis.confidence_score
+                )
+                cached[key] = value
+                if not degraded:
+                    cache.put(key, value)
+        
+        results = []
+        for review, key in zip(reviews, keys):
+            is_fake, sentiment, sentiment_score, category, confidence_score = cached[key]
+            results.append(SingleReviewAnalysis(
+                review_text=review,
+                is_fake=is_fake,
+                sentiment=sentiment,
+                sentiment_score=sentiment_score,
+                category=category,
+                confidence_score=confidence_score
+            ))
+        return results
+    
+    def _is_cacheable(self) -> bool:
+        # In "random" mode the heuristic fake detector's results can't be reused
+        return (
+            settings.PREDICTION_CACHE_ENABLED
+            and (model_loader.has_model("fake") or self.uncertainty_mode != "random")
         )
     
-    def analyze_reviews(self, reviews: List[str]) -> dict:
+    def _score_batch(self, reviews: List[str]) -> Tuple[List[SingleReviewAnalysis], bool]:
+        """Run every model over the batch; also report whether any step hit an error"""
+        self._scoring_state.degraded = False
+        
+        # Lowercase and tokenize each review once for every model and heuristic
+        processed_reviews = [review.lower() for review in reviews]
+        
+        # Reviews with the same analyzer n-grams get identical TF-IDF rows, so the
+        # fake and sentiment models score one of each. The heuristics read each
+        # review's own text ('!' ratio, length), so they still score every review
+        features, rows = self._shared_features(processed_reviews)
+        rows, first_positions = distinct_rows(rows)
+        model_reviews = [reviews[position] for position in first_positions]
+        model_processed_reviews = [processed_reviews[position] for position in first_positions]
+        
+        # Keyword heuristics share one matcher pass when either fallback is in use
+        keyword_counts = None
+        if not model_loader.has_model("fake") or model_loader.category_model is None:
+            keyword_counts = self.count_keywords(processed_reviews)
+        
+        if model_loader.has_model("fake"):
+            fake_results = self.detect_fake_reviews(model_reviews, model_processed_reviews, features.get("fake"))
+            fake_results = [fake_results[row] for row in rows]
+        else:
+            fake_results = self.detect_fake_reviews(reviews, processed_reviews, None, keyword_counts)
+        
+        if model_loader.has_model("sentiment"):
+            sentiment_results = self.analyze_sentiments(model_reviews, model_processed_reviews, features.get("sentiment"))
+            sentiment_results = [sentiment_results[row] for row in rows]
+        else:
+            sentiment_results = self.analyze_sentiments(reviews, processed_reviews)
+        
+        if model_loader.category_model is not None:
+            # The category model has its own analyzer, so only identical texts share a prediction
+            category_rows, category_positions = distinct_rows(processed_reviews)
+            category_reviews = [processed_reviews[position] for position in category_positions]
+            categories = self.categorize_reviews(category_reviews, category_reviews)
+            categories = [categories[row] for row in category_rows]
+        else:
+            categories = self.categorize_reviews(reviews, processed_reviews, keyword_counts)
+        
+        analyses = [
+            SingleReviewAnalysis(
+                review_text=review,
+                is_fake=fake_result,
+                sentiment=sentiment,
+                sentiment_score=sentiment_score,
+                category=category,
+                confidence_score=fake_confidence
+            )
+            for review, (fake_result, fake_confidence), (sentiment, sentiment_score), category
+            in zip(reviews, fake_results, sentiment_results, categories)
+        ]
+        return analyses, self._scoring_state.degraded
+    
+    def _shared_features(self, processed_reviews: List[str]) -> Tuple[Dict[str, Any], List[int]]:
+        """Features of each distinct analyzer output, and the feature row of every review"""
+        names = []
+        if model_loader.has_model("fake"):
+            names.append("fake")
+        if model_loader.has_model("sentiment"):
+            names.append("sentiment")
+        if names:
+            try:
+                return model_loader.transform_unique_reviews(processed_reviews, names)
+            except Exception as e:
+                # Each model falls back to its own vectorizer
+                logger.error(f"Error in shared feature extraction: {str(e)}")
+        return {}, distinct_rows(processed_reviews)[0]
+    
+    def prepare_reviews(self, reviews: List[str]) -> List[str]:
+        """Strip reviews and drop the ones too short to analyze"""
+        return [
+            review.strip() for review in reviews
+            if review and len(review.strip()) >= 5
+        ]
+    
+    def cluster_reviews(self, reviews: List[str]) -> List[int]:
+        """Near-duplicate cluster id of every review; informational, scores are never shared by it"""
+        if not settings.NEAR_DUPLICATE_ENABLED:
+            return list(range(len(reviews)))
+        return cluster_reviews(reviews, settings.NEAR_DUPLICATE_MAX_DISTANCE)
+    
+    def duplicate_ids(self, reviews: List[str]) -> List[int]:
+        """Position of the first identical copy of every review; each distinct text is scored once"""
+        first_positions = {}
+        return [first_positions.setdefault(review, position) for position, review in enumerate(reviews)]
+    
+    def unique_reviews(self, reviews: List[str], duplicate_ids: List[int]) -> List[str]:
+        return [review for position, (review, duplicate_id) in enumerate(zip(reviews, duplicate_ids)) if duplicate_id == position]
+    
+    def fan_out(
+        self,
+        reviews: List[str],
+        duplicate_ids: List[int],
+        unique_analyses: List[SingleReviewAnalysis],
+        cluster_ids: List[int]
+    ) -> List[SingleReviewAnalysis]:
+        """Give every review the scores of its first identical copy, plus its near-duplicate cluster id"""
+        unique_results = iter(unique_analyses)
+        scored = {}
+        results = []
+        for position, (duplicate_id, cluster_id) in enumerate(zip(duplicate_ids, cluster_ids)):
+            if duplicate_id == position:
+                scored[position] = next(unique_results)
+            results.append(scored[duplicate_id].model_copy(update={"review_text": reviews[position], "cluster_id": cluster_id}))
+        return results
+    
+    def analyze_reviews(self, reviews: List[str], model_version: Optional[str] = None) -> dict:
         """
         Analyze multiple reviews and return comprehensive results
         """
-        detailed_results = []
+        reviews = self.prepare_reviews(reviews)
+        duplicate_ids = self.duplicate_ids(reviews)
+        unique_analyses = self.analyze_batch(self.unique_reviews(reviews, duplicate_ids), model_version)
+        return self.assemble_results(reviews, duplicate_ids, unique_analyses)
+    
+    def assemble_results(
+        self,
+        reviews: List[str],
+        duplicate_ids: List[int],
+        unique_analyses: List[SingleReviewAnalysis]
+    ) -> dict:
+        """AnalysisResponse fields for reviews, from the analyses of their distinct texts"""
+        detailed_results = self.fan_out(reviews, duplicate_ids, unique_analyses, self.cluster_reviews(reviews))
+        return {
+            **self.summarize_results(detailed_results),
+            "detailed_results": detailed_results
+        }
+    
+    def summarize_results(self, detailed_results: List[SingleReviewAnalysis]) -> dict:
+        """
+        Aggregate per-review results into the AnalysisResponse summary fields
+        """
         sentiment_counts = {s.value: 0 for s in SentimentType}
         category_counts = {c.value: 0 for c in CategoryType}
         fake_count = 0
         
-        for review in reviews:
-            if not review or len(review.strip()) < 5:
-                continue
-                
-            analysis = self.analyze_single_review(review.strip())
-            detailed_results.append(analysis)
-            
+        for analysis in detailed_results:
             # Update counters
             sentiment_counts[analysis.sentiment.value] += 1
             category_counts[analysis.category.value] += 1
@@ -274,7 +619,6 @@ class ReviewAnalyzer:
             "real_count": real_count,
             "sentiment_distribution": sentiment_counts,
             "category_distribution": category_counts,
-            "detailed_results": detailed_results,
             "overall_sentiment": overall_sentiment,
             "fake_percentage": round(fake_percentage, 2)
         }
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional, Tuple
+from config.settings import settings
+from utils.metrics import metrics
+from database.review_db import get_cached_review_page, save_review_page, ensure_review_cache_indexes
+
+logger = logging.getLogger(__name__)
+
+class ReviewPageCache:
+    """In-process LRU over MongoDB of RapidAPI review pages, keyed by ASIN, country and page"""
+    def __init__(self):
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._pending_writes = set()
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.stale_served = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(asin: str, country: str, page: int) -> Tuple[str, str, int]:
+        return (asin, country, page)
+
+    def _memory_get(self, key) -> Optional[Tuple[List[str], float]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, reviews, fetched_at = entry
+            if time.time() - stored_at > settings.REVIEW_CACHE_MEMORY_TTL_SECONDS:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return reviews, fetched_at
+
+    def _memory_put(self, key, reviews: List[str], fetched_at: float):
+        with self._lock:
+            self._memory[key] = (time.time(), reviews, fetched_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > settings.REVIEW_CACHE_MEMORY_MAX_ENTRIES:
+                self._memory.popitem(last=False)
+
+    async def _lookup(self, asin: str, country: str, page: int) -> Optional[Tuple[List[str], float]]:
+        key = self._key(asin, country, page)
+        cached = self._memory_get(key)
+        if cached is not None:
+            self.memory_hits += 1
+            return cached
+
+        try:
+            # A slow or unreachable database must not hold up the upstream fetch
+            doc = await asyncio.wait_for(
+                get_cached_review_page(asin, country, page),
+                timeout=settings.REVIEW_CACHE_DB_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Review cache read failed for {asin} page {page}: {str(e)}")
+            return None
+
+        if not doc:
+            return None
+
+        self.mongo_hits += 1
+        # PyMongo returns naive datetimes in UTC
+        fetched_at = doc["fetched_at"].replace(tzinfo=timezone.utc).timestamp()
+        self._memory_put(key, doc["reviews"], fetched_at)
+        return doc["reviews"], fetched_at
+
+    def _store(self, asin: str, country: str, page: int, reviews: List[str]):
+        fetched_at = datetime.now(timezone.utc)
+        self._memory_put(self._key(asin, country, page), reviews, fetched_at.timestamp())
+
+        # Persist in the background so the response doesn't wait on the write
+        task = asyncio.ensure_future(self._persist(asin, country, page, reviews, fetched_at))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def _persist(self, asin: str, country: str, page: int, reviews: List[str], fetched_at: datetime):
+        try:
+            await save_review_page(
+                asin, country, page, reviews, fetched_at,
+                timedelta(seconds=settings.REVIEW_CACHE_STALE_TTL_SECONDS)
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Review cache write failed for {asin} page {page}: {str(e)}")
+
+    async def get_page(
+        self,
+        asin: str,
+        country: str,
+        page: int,
+        fetch: Callable[[], Awaitable[Optional[List[str]]]]
+    ) -> Optional[List[str]]:
+        """Return a cached page, calling fetch() only when it is missing or stale"""
+        if not settings.REVIEW_CACHE_ENABLED:
+            return await fetch()
+
+        key = self._key(asin, country, page)
+        entry = self._inflight.get(key)
+        # A finished task stays registered until its done callback runs
+        if entry is None or entry[0].done():
+            task = asyncio.ensure_future(self._get_page(asin, country, page, fetch))
+            entry = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._forget_inflight(key, done))
+
+        # Shared by every concurrent caller; cancelled once nobody waits for it
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                # Later callers must not join a task that is being cancelled
+                task.cancel()
+                self._forget_inflight(key, task)
+
+    def _forget_inflight(self, key, task):
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+
+    async def _get_page(self, asin, country, page, fetch) -> Optional[List[str]]:
+        cached = await self._lookup(asin, country, page)
+        if cached is not None and not cached[0]:
+            # Empty pages stored before they stopped being cached
+            cached = None
+        if cached is not None:
+            reviews, fetched_at = cached
+            age = time.time() - fetched_at
+            if age <= settings.REVIEW_CACHE_TTL_SECONDS:
+                logger.info(f"💾 Review cache hit for {asin} page {page}")
+                metrics.count_cache_lookups("review", "hit")
+                return reviews
+            self.refreshes += 1
+            metrics.count_cache_lookups("review", "expired")
+        else:
+            self.misses += 1
+            metrics.count_cache_lookups("review", "miss")
+
+        fresh_reviews = await fetch()
+        # The API reports some errors as a 200 without reviews, so an empty
+        # page is never cached; it would hide the product's reviews for hours
+        if fresh_reviews:
+            self._store(asin, country, page, fresh_reviews)
+            return fresh_reviews
+
+        if cached is not None and age <= settings.REVIEW_CACHE_STALE_TTL_SECONDS:
+            self.stale_served += 1
+            logger.warning(f"♻️ Serving stale cached reviews for {asin} page {page}")
+            return cached[0]
+        return fresh_reviews
+
+    async def ensure_indexes(self):
+        try:
+            await ensure_review_cache_indexes()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create review cache indexes: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.REVIEW_CACHE_ENABLED,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "stale_served": self.stale_served,
+            "errors": self.errors
+        }
+
+# Global review cache instance
+review_cache = ReviewPageCache()
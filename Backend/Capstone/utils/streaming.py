@@ -0,0 +1,64 @@
+import json
+import logging
+from typing import AsyncIterator, List, Optional
+from config.settings import settings
+from utils.inference_service import inference_service
+from utils.near_duplicates import NearDuplicateIndex
+from utils.prediction import review_analyzer
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _ndjson(record: dict) -> str:
+    return json.dumps(record) + "\n"
+
+async def iter_review_list(reviews: List[str]) -> AsyncIterator[List[str]]:
+    """Wrap an in-memory list so it can be streamed like fetched pages"""
+    if reviews:
+        yield reviews
+
+async def stream_review_analysis(review_batches: AsyncIterator[List[str]]) -> AsyncIterator[str]:
+    """Score reviews as they arrive and emit one NDJSON record per review.
+
+    Each incoming batch (e.g. a page of fetched reviews) is scored in chunks
+    of STREAM_BATCH_SIZE, so the first results go out after a single page
+    fetch and one scoring batch. As in analyze_reviews, every review gets a
+    record, identical reviews share the scores of the first copy, and
+    near-duplicates are only marked with the cluster_id of an earlier
+    review. The stream ends with a "summary" record carrying the same
+    aggregate fields as AnalysisResponse, or an "error" record if analysis
+    fails midway.
+    """
+    detailed_results = []
+    scored = {}
+    batch_size = max(1, settings.STREAM_BATCH_SIZE)
+    index: Optional[NearDuplicateIndex] = None
+    if settings.NEAR_DUPLICATE_ENABLED:
+        index = NearDuplicateIndex(settings.NEAR_DUPLICATE_MAX_DISTANCE)
+    position = 0
+
+    try:
+        async for reviews in review_batches:
+            batch = []
+            for review in review_analyzer.prepare_reviews(reviews):
+                batch.append((review, index.add(review, position) if index else position))
+                position += 1
+
+            for start in range(0, len(batch), batch_size):
+                chunk = batch[start:start + batch_size]
+                # Only texts not scored earlier in the stream go to the models
+                new_reviews = list(dict.fromkeys(review for review, _ in chunk if review not in scored))
+                if new_reviews:
+                    analyses = await inference_service.analyze_batch(new_reviews)
+                    scored.update(zip(new_reviews, analyses))
+                for review, cluster_id in chunk:
+                    analysis = scored[review].model_copy(update={"cluster_id": cluster_id})
+                    detailed_results.append(analysis)
+                    yield _ndjson({"type": "result", "data": analysis.dict()})
+
+        yield _ndjson({"type": "summary", "data": review_analyzer.summarize_results(detailed_results)})
+
+    except Exception as e:
+        logger.error(f"Error in streaming analysis: {str(e)}")
+        yield _ndjson({"type": "error", "detail": "Internal server error during analysis"})
@@ -0,0 +1,265 @@
+import logging
+import re
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import (
+    ENGLISH_STOP_WORDS,
+    TfidfVectorizer,
+    strip_accents_ascii,
+    strip_accents_unicode,
+)
+from sklearn.preprocessing import normalize
+
+logger = logging.getLogger(__name__)
+
+# Vectorizer parameters that decide which n-grams a document produces
+ANALYZER_PARAMS = (
+    "input", "encoding", "decode_error", "strip_accents", "lowercase",
+    "preprocessor", "tokenizer", "analyzer", "stop_words", "token_pattern",
+    "ngram_range",
+)
+
+def analyzer_params(vectorizer: Any) -> Dict[str, Any]:
+    """Return a vectorizer's text analysis settings"""
+    params = vectorizer.get_params()
+    return {name: params.get(name) for name in ANALYZER_PARAMS}
+
+def analyzer_key(vectorizer: Any) -> Tuple:
+    """Identify a vectorizer's text analysis settings"""
+    key = []
+    for name, value in analyzer_params(vectorizer).items():
+        if isinstance(value, (list, set, frozenset)):
+            value = frozenset(value)
+        key.append((name, value))
+    return tuple(key)
+
+def distinct_rows(keys: Sequence[Hashable]) -> Tuple[List[int], List[int]]:
+    """Row of each key among the distinct keys, and the position where each distinct key first appears"""
+    row_ids: Dict[Hashable, int] = {}
+    rows = []
+    first_positions = []
+    for position, key in enumerate(keys):
+        row = row_ids.setdefault(key, len(row_ids))
+        if row == len(first_positions):
+            first_positions.append(position)
+        rows.append(row)
+    return rows, first_positions
+
+ACCENT_STRIPPERS = {"ascii": strip_accents_ascii, "unicode": strip_accents_unicode}
+
+def compile_analyzer(params: Dict[str, Any]) -> Callable[[str], List[str]]:
+    """Build a text -> n-grams function equivalent to the vectorizer's own analyzer.
+
+    Plain word analyzers (the saved vectorizers) get a precompiled version
+    that skips sklearn's chain of decode/preprocess/tokenize/n-gram calls
+    and joins n-grams with zip. Anything else (char analyzers, custom
+    callables, file input) falls back to sklearn's analyzer.
+    """
+    plain = (
+        params.get("analyzer") == "word"
+        and params.get("input") == "content"
+        and params.get("preprocessor") is None
+        and params.get("tokenizer") is None
+        and params.get("strip_accents") in (None, "ascii", "unicode")
+        and isinstance(params.get("token_pattern"), str)
+    )
+    if not plain:
+        params = dict(params)
+        params["ngram_range"] = tuple(params["ngram_range"])
+        return TfidfVectorizer(**params).build_analyzer()
+
+    lowercase = params.get("lowercase", True)
+    strip_accents = ACCENT_STRIPPERS.get(params.get("strip_accents"))
+    token_pattern = re.compile(params["token_pattern"])
+    if token_pattern.groups > 1:
+        raise ValueError("More than 1 capturing group in token pattern")
+    find_tokens = token_pattern.findall
+    stop_words = params.get("stop_words")
+    if stop_words == "english":
+        stop_words = ENGLISH_STOP_WORDS
+    elif stop_words is not None:
+        stop_words = frozenset(stop_words)
+    min_n, max_n = params.get("ngram_range") or (1, 1)
+
+    def analyze(text: str) -> List[str]:
+        if lowercase:
+            text = text.lower()
+        if strip_accents is not None:
+            text = strip_accents(text)
+        tokens = find_tokens(text)
+        if stop_words:
+            tokens = [token for token in tokens if token not in stop_words]
+        terms = tokens if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            if n == 2:
+                terms = terms + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+            else:
+                terms = terms + list(map(" ".join, zip(*(tokens[offset:] for offset in range(n)))))
+        return terms
+
+    return analyze
+
+class TfidfWeighting:
+    """The tf/idf settings and weights of one fitted vectorizer"""
+    def __init__(
+        self,
+        n_features: int,
+        idf: Optional[np.ndarray],
+        binary: bool = False,
+        sublinear_tf: bool = False,
+        norm: Optional[str] = "l2",
+        dtype: Any = np.float64
+    ):
+        self.n_features = n_features
+        self.idf = idf
+        self.binary = binary
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.dtype = np.dtype(dtype)
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer: Any) -> "TfidfWeighting":
+        return cls(
+            n_features=len(vectorizer.vocabulary_),
+            idf=vectorizer.idf_ if vectorizer.use_idf else None,
+            binary=vectorizer.binary,
+            sublinear_tf=vectorizer.sublinear_tf,
+            norm=vectorizer.norm,
+            dtype=vectorizer.dtype
+        )
+
+class SharedFeaturizer:
+    """Builds TF-IDF matrices for several vectorizers from one n-gram pass.
+
+    Vectorizers with identical analysis settings share a single tokenizer run
+    per document, and their vocabularies are merged into one lookup that maps
+    each n-gram to its column in every vectorizer, so each n-gram is looked up
+    once no matter how many models consume it. The output matches each
+    vectorizer's own transform().
+
+    A group's vocabulary can be a plain dict or anything else with a dict-like
+    get(), such as the memory-mapped table of a model bundle.
+
+    Known n-grams of the whole batch are looked up into one preallocated
+    column buffer; counting, CSR assembly and weighting are then numpy
+    operations rather than a dict per document.
+    """
+    def __init__(self, groups: List[Tuple[List[str], Callable, Any]], weightings: Dict[str, TfidfWeighting]):
+        self.groups = groups
+        self.weightings = weightings
+
+        logger.info(
+            f"Shared featurizer ready: {len(self.weightings)} vectorizers "
+            f"in {len(self.groups)} tokenization group(s)"
+        )
+
+    @classmethod
+    def from_vectorizers(cls, vectorizers: Dict[str, Any]) -> "SharedFeaturizer":
+        """Build from fitted sklearn vectorizers, skipping the ones that are None"""
+        vectorizers = {name: vec for name, vec in vectorizers.items() if vec is not None}
+
+        grouped: Dict[Tuple, List[str]] = {}
+        for name, vectorizer in vectorizers.items():
+            grouped.setdefault(analyzer_key(vectorizer), []).append(name)
+
+        groups = []
+        for names in grouped.values():
+            analyze = compile_analyzer(analyzer_params(vectorizers[names[0]]))
+            vocabularies = [vectorizers[name].vocabulary_ for name in names]
+            groups.append((names, analyze, merge_vocabularies(vocabularies)))
+
+        weightings = {name: TfidfWeighting.from_vectorizer(vec) for name, vec in vectorizers.items()}
+        return cls(groups, weightings)
+
+    def transform(self, texts: List[str], names: Optional[Sequence[str]] = None) -> Dict[str, sp.csr_matrix]:
+        """Return a TF-IDF matrix per requested vectorizer for a batch of texts"""
+        wanted = set(names) if names is not None else set(self.weightings)
+        return self._matrices(wanted, self._analyze(texts, wanted))
+
+    def transform_unique(
+        self,
+        texts: List[str],
+        names: Optional[Sequence[str]] = None
+    ) -> Tuple[Dict[str, sp.csr_matrix], List[int]]:
+        """Like transform(), but with one row per distinct n-gram stream; rows[i] is the row of texts[i].
+
+        Texts whose known n-grams match in every group get identical TF-IDF
+        rows, so they are weighted and scored once.
+        """
+        wanted = set(names) if names is not None else set(self.weightings)
+        analyzed = self._analyze(texts, wanted)
+        rows, first_positions = distinct_rows([
+            tuple(tuple(text_hits[position]) for _, text_hits in analyzed)
+            for position in range(len(texts))
+        ])
+        analyzed = [
+            (group_names, [text_hits[position] for position in first_positions])
+            for group_names, text_hits in analyzed
+        ]
+        return self._matrices(wanted, analyzed), rows
+
+    def _analyze(self, texts: List[str], wanted: set) -> List[Tuple[List[str], List[List[Tuple[int, ...]]]]]:
+        """Vocabulary hits of every text, per tokenization group with a wanted vectorizer"""
+        analyzed = []
+        for group_names, analyze, vocabulary in self.groups:
+            if not wanted.intersection(group_names):
+                continue
+            get = vocabulary.get
+            analyzed.append((group_names, [
+                [columns for columns in map(get, analyze(text)) if columns is not None]
+                for text in texts
+            ]))
+        return analyzed
+
+    def _matrices(self, wanted: set, analyzed: List[Tuple[List[str], List[List[Tuple[int, ...]]]]]) -> Dict[str, sp.csr_matrix]:
+        matrices = {}
+        for group_names, text_hits in analyzed:
+            width = len(group_names)
+            hit_counts = np.fromiter(map(len, text_hits), dtype=np.int64, count=len(text_hits))
+            total = int(hit_counts.sum()) * width
+            hits = chain.from_iterable(chain.from_iterable(text_hits))
+            columns = np.fromiter(hits, dtype=np.int64, count=total).reshape(-1, width)
+            rows = np.repeat(np.arange(len(text_hits), dtype=np.int64), hit_counts)
+
+            for position, name in enumerate(group_names):
+                if name in wanted:
+                    matrices[name] = self._tfidf(self.weightings[name], rows, columns[:, position], len(text_hits))
+
+        return matrices
+
+    @staticmethod
+    def _tfidf(weighting: TfidfWeighting, rows: np.ndarray, columns: np.ndarray, n_rows: int) -> sp.csr_matrix:
+        """Count (row, column) hits into a CSR matrix, then apply the vectorizer's weighting"""
+        # Columns of -1 are n-grams only the group's other vectorizers know
+        known = columns >= 0
+        keys, counts = np.unique(rows[known] * weighting.n_features + columns[known], return_counts=True)
+
+        # np.unique sorts the keys, so rows come out in order with sorted indices
+        indptr = np.zeros(n_rows + 1, dtype=np.int32)
+        np.cumsum(np.bincount(keys // weighting.n_features, minlength=n_rows), out=indptr[1:])
+        counts = sp.csr_matrix(
+            (counts.astype(weighting.dtype), (keys % weighting.n_features).astype(np.int32), indptr),
+            shape=(n_rows, weighting.n_features),
+        )
+
+        if weighting.binary:
+            counts.data.fill(1)
+        if weighting.sublinear_tf:
+            np.log(counts.data, counts.data)
+            counts.data += 1.0
+        if weighting.idf is not None:
+            counts.data *= weighting.idf[counts.indices]
+        if weighting.norm is not None:
+            counts = normalize(counts, norm=weighting.norm, copy=False)
+        return counts
+
+def merge_vocabularies(vocabularies: Sequence[Dict[str, int]]) -> Dict[str, Tuple[int, ...]]:
+    """Map each term to its column in every vocabulary (-1 if absent)"""
+    merged: Dict[str, List[int]] = {}
+    for position, vocabulary in enumerate(vocabularies):
+        for term, column in vocabulary.items():
+            columns = merged.setdefault(term, [-1] * len(vocabularies))
+            columns[position] = column
+    return {term: tuple(columns) for term, columns in merged.items()}
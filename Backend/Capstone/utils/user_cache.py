@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from config.settings import settings
+from utils.metrics import metrics
+
+class UserCache:
+    """In-process LRU of authenticated users keyed by username, with a TTL"""
+    def __init__(self):
+        self._entries = OrderedDict()
+        # Bumped by every invalidation, so a load that raced with one isn't stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, username: str, load: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        """The cached user, or load() on a miss; callers get their own copy"""
+        if settings.USER_CACHE_ENABLED:
+            entry = self._entries.get(username)
+            if entry is not None and time.monotonic() - entry[0] <= settings.USER_CACHE_TTL_SECONDS:
+                self._entries.move_to_end(username)
+                self.hits += 1
+                metrics.count_cache_lookups("user", "hit")
+                return dict(entry[1])
+            self.misses += 1
+            metrics.count_cache_lookups("user", "miss")
+
+        generation = self._generation
+        user = await load()
+        if user is not None and settings.USER_CACHE_ENABLED and generation == self._generation:
+            self._entries[username] = (time.monotonic(), dict(user))
+            self._entries.move_to_end(username)
+            while len(self._entries) > settings.USER_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, username: Optional[str] = None):
+        """Drop one user, or every user when username is None"""
+        self._generation += 1
+        if username is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(username, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.USER_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "ttl_seconds": settings.USER_CACHE_TTL_SECONDS,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# Global user cache instance
+user_cache = UserCache()
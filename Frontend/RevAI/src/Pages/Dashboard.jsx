@@ -218,7 +218,7 @@ export default function Dashboard() {
                 const timeAgo = item.timestamp ? new Date(item.timestamp).toLocaleString() : "Unknown time";
 
                 // Determine a meaningful title: prefer product_url, else first review text
-                const firstReview = item?.detailed_results?.[0]?.review_text || item?.manual_input || "";
+                const firstReview = item?.preview_text || item?.manual_input || "";
                 const truncate = (str, n = 120) => (str && str.length > n ? str.slice(0, n) + "…" : str);
                 const prettyUrl = (url) => {
                   try {